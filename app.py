@@ -12,22 +12,48 @@ Features:
  - Admin endpoints for management
 """
 
-from flask import Flask, request, jsonify, Response, render_template_string, redirect, url_for, render_template
+from flask import Flask, request, g, has_request_context, jsonify, Response, redirect, url_for, render_template
+from markupsafe import Markup, escape
 from werkzeug.http import HTTP_STATUS_CODES
+from werkzeug.wsgi import wrap_file
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.exceptions import HTTPError as UpstreamHTTPError
 import os
+import re
+import mmap
 import sqlite3
 import logging
+import logging.handlers
 import smtplib
-import uuid
+from secrets import token_hex
 import ssl
 import time
+import fcntl
+import random
+import signal
+import sys
+import tempfile
+import queue
 import threading
+import atexit
 from datetime import datetime, timedelta, timezone
-from functools import lru_cache
+from collections import Counter
+from itertools import islice
 from dotenv import load_dotenv
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from email.header import Header
+import json
+from flask.json.provider import DefaultJSONProvider
+
+# Optional: orjson serializes JSON responses and audit details several times
+# faster than the stdlib; everything falls back to json when it is missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Register HTTP 451 status code with Werkzeug
 HTTP_STATUS_CODES[451] = 'Unavailable For Legal Reasons'
@@ -43,6 +69,15 @@ APP_PORT = int(os.getenv('APP_PORT', '8081'))
 
 IPFS_HTTP_GATEWAY = os.getenv('IPFS_HTTP_GATEWAY', 'http://127.0.0.1:8080')
 DATABASE_PATH = os.getenv('DATABASE_PATH', 'database/servebeer.db')
+# NORMAL (default) may lose the last commits on power loss but never corrupts
+# the WAL database; FULL fsyncs every commit for strict durability
+DB_SYNC_MODE = os.getenv('DB_SYNC_MODE', 'NORMAL').upper()
+if DB_SYNC_MODE not in ('OFF', 'NORMAL', 'FULL', 'EXTRA'):
+    DB_SYNC_MODE = 'NORMAL'
+# request_log rows older than this are deleted hourly (0 = keep forever)
+REQUEST_LOG_RETENTION_DAYS = int(os.getenv('REQUEST_LOG_RETENTION_DAYS', '90'))
+RETENTION_CHECK_INTERVAL = 3600
+RETENTION_PURGE_BATCH = 5000  # rows per DELETE, so the log writers are never locked out for long
 LOG_FILE = os.getenv('LOG_FILE', 'logs/servebeer_audit.log')
 
 # Copyright jurisdiction (US, EU, FR, PL)
@@ -54,12 +89,41 @@ DMCA_SMTP_PORT = int(os.getenv('DMCA_SMTP_PORT', 587))
 DMCA_SMTP_USER = os.getenv('DMCA_SMTP_USER')
 DMCA_SMTP_PASS = os.getenv('DMCA_SMTP_PASS')
 DMCA_NOTIFY_TO = os.getenv('DMCA_NOTIFY_TO', DMCA_SMTP_USER or 'admin@example.com')
+# Fixed at startup: notices are mailed only when SMTP is fully configured
+DMCA_MAIL_ENABLED = bool(DMCA_SMTP_HOST and DMCA_SMTP_USER and DMCA_SMTP_PASS)
 
 # Blacklist settings
 BLACKLIST_FILE = os.getenv('BLACKLIST_FILE', 'blacklist.txt')
 IPFS_DENYLIST_FILE = os.getenv('IPFS_DENYLIST_FILE', 'blacklist-ipfs-official.txt')
+BLACKLIST_WATCH_INTERVAL = 5  # seconds between blacklist file mtime checks
 IPFS_DENYLIST_URL = "https://raw.githubusercontent.com/ipfs/infra/master/ipfs/gateway/denylist.conf"
-BLACKLIST_CACHE_TIME = 300  # 5 minutes
+DENYLIST_SYNC_INTERVAL = 86400   # seconds between successful denylist syncs
+DENYLIST_RETRY_INTERVAL = 3600   # wait before retrying after a failed sync
+
+# Nginx denylist entry, e.g.: location ~ "^/ipfs/QmXXXX" {
+DENYLIST_LINE_RE = re.compile(rb'location\s+(?:[~=^]+\*?\s+)?"\^?/(?:ipfs|ipns)/([A-Za-z0-9]{11,})')
+DENYLIST_CID_PREFIXES = (b'Qm', b'bafy', b'k51')
+
+# Proxied responses larger than this are handed to the WSGI server's
+# file_wrapper instead of being re-chunked through a Python generator
+PROXY_PASSTHROUGH_MIN_BYTES = 1_000_000
+
+# Client request headers passed through to the IPFS daemon
+PROXY_FORWARD_HEADERS = ('Range', 'If-Range', 'If-None-Match', 'If-Modified-Since')
+
+# Endpoints not written to request_log (probes, static assets, read-only admin
+# GETs); admin actions that change state are POST and still logged
+SKIP_LOG_ENDPOINTS = frozenset({
+    'static', 'health', 'blacklist_stats', 'test_blacklist', 'list_jurisdictions',
+    'test_denylist_download', 'test_blocked_page',
+})
+# Fraction of remaining requests written to request_log (1.0 = all)
+REQUEST_LOG_SAMPLE = min(1.0, max(0.0, float(os.getenv('REQUEST_LOG_SAMPLE', '1.0'))))
+
+# Batched DB log writer settings
+LOG_BATCH_SIZE = 500       # max rows per transaction
+LOG_QUEUE_MAX = 10000      # pending rows per queue before new ones are dropped
+LOG_FLUSH_INTERVAL = 0.2   # seconds to wait for a batch to fill
 
 # Ensure blacklist files exist
 if not os.path.exists(BLACKLIST_FILE):
@@ -79,25 +143,92 @@ app.config.update(
     PERMANENT_SESSION_LIFETIME=timedelta(days=30)
 )
 
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson (sorted keys, like the default)"""
+    def dumps(self, obj, **kwargs):
+        # Datetimes go through Flask's default (HTTP date), as with stdlib json
+        return orjson.dumps(obj, default=self.default,
+                            option=orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+if orjson:
+    app.json = OrjsonProvider(app)
+
+def dumps_details(details):
+    """Serialize audit details: dicts/lists as JSON, strings unchanged"""
+    if details is None or isinstance(details, str):
+        return details
+    if orjson:
+        return orjson.dumps(details, default=str).decode()
+    return json.dumps(details, default=str, ensure_ascii=False, separators=(',', ':'))
+
+# HTTP 451 page (templates/blocked_451.html), compiled once at import
+TPL_451 = app.jinja_env.get_template('blocked_451.html')
+
+# --- Shared HTTP session (keep-alive connection pool to IPFS daemon / denylist host) ---
+http_session = requests.Session()
+# Retry only connection setup and 502/503 before any body is read; read=0
+# so a slow stream is never re-requested after a timeout. Not 504: Kubo
+# answers that when retrieval timed out, and retrying would hold the
+# request thread for several more gateway timeouts
+_http_adapter = HTTPAdapter(pool_connections=32, pool_maxsize=256, max_retries=Retry(
+    total=2, read=0, backoff_factor=0.1,
+    status_forcelist=(502, 503), raise_on_status=False))
+http_session.mount('http://', _http_adapter)
+http_session.mount('https://', _http_adapter)
+
 # --- Copyright Plugin Manager ---
 copyright_manager = CopyrightPluginManager(default_country=COPYRIGHT_COUNTRY)
 
+# Active plugin and its footer HTML, looked up once and refreshed only when
+# the jurisdiction changes (see refresh_active_plugin)
+_ACTIVE = {'plugin': None, 'footer': ''}
+
+def refresh_active_plugin():
+    """Re-read the active plugin from the manager and rebuild its footer"""
+    plugin = copyright_manager.get_active()
+    _ACTIVE['footer'] = plugin.get_footer_html() if plugin else ""
+    _ACTIVE['plugin'] = plugin
+    return plugin
+
+refresh_active_plugin()
+
 # --- Logging setup ---
+# Request threads only enqueue records; a QueueListener thread owns the file
+# handler, so writes and rotation happen off the request path.
+_log_file_handler = logging.handlers.RotatingFileHandler(LOG_FILE, maxBytes=50_000_000, backupCount=5)
+_log_file_handler.setFormatter(logging.Formatter(
+    '%(asctime)s | %(levelname)s | %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+))
+_log_q = queue.Queue()
+# force=True: plugin loading above may already have installed a default handler
 logging.basicConfig(
-    filename=LOG_FILE,
     level=logging.INFO,
-    format='%(asctime)s | %(levelname)s | %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
+    format='%(message)s',
+    handlers=[logging.handlers.QueueHandler(_log_q)],
+    force=True
 )
+_log_listener = logging.handlers.QueueListener(_log_q, _log_file_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 
 # --- Database setup ---
 def setup_database():
-    """Create minimal tables: audit_log, request_log"""
+    """Create minimal tables: audit_log, request_log, user_agents"""
     conn = sqlite3.connect(DATABASE_PATH)
     c = conn.cursor()
+    # WAL is persistent in the DB file; synchronous=NORMAL is crash-safe under WAL
+    c.execute('PRAGMA journal_mode=WAL')
+    c.execute(f'PRAGMA synchronous={DB_SYNC_MODE}')
+    c.execute('PRAGMA temp_store=MEMORY')
+    c.execute('PRAGMA mmap_size=268435456')
+    c.execute('PRAGMA cache_size=-20000')
     c.execute('''
         CREATE TABLE IF NOT EXISTS audit_log (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            id INTEGER PRIMARY KEY,
             event_type TEXT NOT NULL,
             user_id TEXT,
             ip_address TEXT,
@@ -108,115 +239,332 @@ def setup_database():
     ''')
     c.execute('''
         CREATE TABLE IF NOT EXISTS request_log (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            id INTEGER PRIMARY KEY,
             ip_address TEXT NOT NULL,
             method TEXT NOT NULL,
             endpoint TEXT NOT NULL,
             user_agent TEXT,
             timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            user_id TEXT
+            user_id TEXT,
+            ua_id INTEGER REFERENCES user_agents(id)
+        )
+    ''')
+    # Distinct User-Agent strings; request_log stores only the small ua_id
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS user_agents (
+            id INTEGER PRIMARY KEY,
+            user_agent TEXT NOT NULL UNIQUE
         )
     ''')
+    # Small key/value store for state that must survive restarts (denylist sync)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS kv_state (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    ''')
+    # Databases created before ua_id existed keep the legacy user_agent column
+    columns = {row[1] for row in c.execute('PRAGMA table_info(request_log)')}
+    if 'ua_id' not in columns:
+        c.execute('ALTER TABLE request_log ADD COLUMN ua_id INTEGER REFERENCES user_agents(id)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_audit_ts ON audit_log(timestamp)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_audit_event ON audit_log(event_type, timestamp)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_audit_cid ON audit_log(cid) WHERE cid IS NOT NULL')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_request_ts ON request_log(timestamp)')
     conn.commit()
     conn.close()
 
+_tls = threading.local()
+
 def db_conn():
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
+    """Return this thread's persistent SQLite connection (opened on first use)"""
+    conn = getattr(_tls, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(DATABASE_PATH, timeout=5)
+        conn.row_factory = sqlite3.Row
+        # synchronous is per-connection, journal_mode=WAL is kept by the DB file
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(f'PRAGMA synchronous={DB_SYNC_MODE}')
+        conn.execute('PRAGMA busy_timeout=5000')
+        _tls.conn = conn
     return conn
 
+def purge_request_log():
+    """Delete request_log rows older than REQUEST_LOG_RETENTION_DAYS (0 keeps all)"""
+    if REQUEST_LOG_RETENTION_DAYS <= 0:
+        return
+    conn = db_conn()
+    cutoff = _utc_timestamp(datetime.now(timezone.utc) - timedelta(days=REQUEST_LOG_RETENTION_DAYS))
+    deleted = 0
+    # The first purge on an old database can cover millions of rows; short
+    # transactions let the log writers commit in between instead of hitting
+    # busy_timeout
+    while True:
+        with conn:
+            n = conn.execute(
+                'DELETE FROM request_log WHERE rowid IN '
+                '(SELECT rowid FROM request_log WHERE timestamp < ? LIMIT ?)',
+                (cutoff, RETENTION_PURGE_BATCH)).rowcount
+            deleted += n
+            if n < RETENTION_PURGE_BATCH:
+                # User-Agent strings are fingerprinting data too: drop the
+                # ones no remaining row refers to
+                if deleted:
+                    conn.execute('DELETE FROM user_agents WHERE id NOT IN '
+                                 '(SELECT ua_id FROM request_log WHERE ua_id IS NOT NULL)')
+                break
+    if deleted:
+        logging.info(f"Purged {deleted} request_log rows older than {REQUEST_LOG_RETENTION_DAYS} days")
+
+def retention_worker():
+    """Run purge_request_log() at startup and then hourly"""
+    while True:
+        try:
+            purge_request_log()
+        except Exception as e:
+            logging.error(f"request_log retention purge failed: {e}")
+        if _stop.wait(RETENTION_CHECK_INTERVAL):
+            return
+
+def kv_get(key, default=None):
+    """Read a value from kv_state"""
+    row = db_conn().execute('SELECT value FROM kv_state WHERE key = ?', (key,)).fetchone()
+    return row[0] if row else default
+
+def kv_set(key, value):
+    """Insert or replace a value in kv_state"""
+    conn = db_conn()
+    with conn:
+        conn.execute('INSERT OR REPLACE INTO kv_state (key, value) VALUES (?, ?)', (key, value))
+
+# --- Batched log writers ---
+# Request threads only enqueue rows; background threads write them to SQLite
+# in batches so the request path never waits for a commit/fsync.
+# Fixed SQL text: sqlite3 keeps compiled statements in a per-connection
+# cache keyed by the exact string, so each writer thread parses these once.
+SQL_REQ_INSERT = ('INSERT INTO request_log (ip_address, method, endpoint, ua_id, user_id, timestamp) '
+                  'VALUES (?, ?, ?, (SELECT id FROM user_agents WHERE user_agent = ?), ?, ?)')
+SQL_AUDIT_INSERT = 'INSERT INTO audit_log (event_type, user_id, ip_address, cid, details, timestamp) VALUES (?, ?, ?, ?, ?, ?)'
+SQL_UA_INSERT = 'INSERT OR IGNORE INTO user_agents (user_agent) VALUES (?)'
+
+# Bounded so a stalled disk cannot grow memory without limit; request_log
+# rows that do not fit are dropped (best-effort GDPR metadata), audit_log
+# rows are written synchronously instead (see audit_log())
+_req_log_q = queue.Queue(maxsize=LOG_QUEUE_MAX)
+_audit_log_q = queue.Queue(maxsize=LOG_QUEUE_MAX)
+_dropped_rows = {'request_log': 0, 'audit_log': 0}
+
+def _enqueue_row(q, table, row):
+    """Queue a row for the writer thread, dropping it if the queue is full"""
+    try:
+        q.put_nowait(row)
+    except queue.Full:
+        _dropped_rows[table] += 1
+        if _dropped_rows[table] % 1000 == 1:
+            logging.warning(f"{table} queue full, dropped {_dropped_rows[table]} rows so far")
+
+def utc_now():
+    """Current UTC time; taken once per request and reused for all its log rows"""
+    if not has_request_context():
+        return datetime.now(timezone.utc)
+    now = g.get('ts_utc')
+    if now is None:
+        now = g.ts_utc = datetime.now(timezone.utc)
+    return now
+
+def request_id():
+    """Short random id for the current request (shown on 451 pages, logged with audits)"""
+    rid = g.get('request_id')
+    if rid is None:
+        rid = g.request_id = token_hex(4)
+    return rid
+
+def _utc_timestamp(now=None):
+    """UTC timestamp in the same format as SQLite CURRENT_TIMESTAMP"""
+    return (now or utc_now()).strftime('%Y-%m-%d %H:%M:%S')
+
+def _write_request_rows(conn, rows):
+    """Insert request_log rows; they carry the raw User-Agent, resolved to ua_id here"""
+    # New User-Agents are added in the same transaction, so the request
+    # thread never writes to user_agents itself
+    conn.executemany(SQL_UA_INSERT, {(row[3],) for row in rows})
+    conn.executemany(SQL_REQ_INSERT, rows)
+
+def _write_audit_rows(conn, rows):
+    """Insert audit_log rows"""
+    conn.executemany(SQL_AUDIT_INSERT, rows)
+
+def _db_log_worker(q, write_rows):
+    """Drain queued rows into SQLite, one transaction per batch"""
+    while True:
+        rows = [q.get()]
+        deadline = time.monotonic() + LOG_FLUSH_INTERVAL
+        while len(rows) < LOG_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                rows.append(q.get(timeout=remaining))
+            except queue.Empty:
+                break
+        try:
+            conn = db_conn()
+            with conn:
+                write_rows(conn, rows)
+        except Exception as e:
+            logging.error(f"Failed to write {len(rows)} log rows to DB: {e}")
+        finally:
+            for _ in rows:
+                q.task_done()
+
+def _flush_log_queues():
+    """Write out rows still queued at shutdown (writer threads are daemons)"""
+    for q, write_rows in ((_req_log_q, _write_request_rows), (_audit_log_q, _write_audit_rows)):
+        rows = []
+        while True:
+            try:
+                rows.append(q.get_nowait())
+            except queue.Empty:
+                break
+        if rows:
+            try:
+                conn = db_conn()
+                with conn:
+                    write_rows(conn, rows)
+            except Exception as e:
+                logging.error(f"Failed to flush {len(rows)} log rows at shutdown: {e}")
+            for _ in rows:
+                q.task_done()
+        # Give the writer thread a moment to commit the batch it already holds
+        deadline = time.monotonic() + 2
+        while q.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+def start_log_writers():
+    """Start background threads flushing request_log and audit_log"""
+    threading.Thread(target=_db_log_worker, args=(_req_log_q, _write_request_rows), daemon=True).start()
+    threading.Thread(target=_db_log_worker, args=(_audit_log_q, _write_audit_rows), daemon=True).start()
+    atexit.register(_flush_log_queues)
+
 def audit_log(event_type, user_id=None, ip_address=None, cid=None, details=None):
-    """Log to file and DB - safe fallback if DB fails"""
+    """Log to file and queue for DB - DB write happens in background"""
+    now = utc_now()
     entry = {
         'event': event_type,
         'user_id': user_id,
         'ip': ip_address or request.remote_addr if request else ip_address,
         'cid': cid,
         'details': details,
-        'timestamp': datetime.now(timezone.utc).isoformat()
+        'timestamp': now.isoformat()
     }
+    if has_request_context():
+        entry['request_id'] = request_id()
     logging.info(f"AUDIT: {entry}")
+    row = (event_type, user_id, entry['ip'], cid, dumps_details(details), _utc_timestamp(now))
     try:
-        conn = db_conn()
-        conn.execute('''
-            INSERT INTO audit_log (event_type, user_id, ip_address, cid, details)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (event_type, user_id, entry['ip'], cid, str(details)))
-        conn.commit()
-        conn.close()
-    except Exception as e:
-        logging.error(f"Failed to write audit_log to DB: {e}")
+        _audit_log_q.put_nowait(row)
+    except queue.Full:
+        # Audit rows are compliance records: when the writer falls behind,
+        # apply backpressure by writing on the calling thread instead of dropping
+        try:
+            conn = db_conn()
+            with conn:
+                conn.execute(SQL_AUDIT_INSERT, row)
+        except Exception as e:
+            logging.error(f"Failed to write audit_log row to DB: {e}")
 
 @app.before_request
 def log_request_gdpr():
-    """Log requests to database (GDPR compliant)"""
-    if request.endpoint and request.endpoint.startswith('static'):
+    """Queue request log row (GDPR compliant)"""
+    endpoint = request.endpoint
+    if endpoint in SKIP_LOG_ENDPOINTS or (endpoint or '').startswith('static'):
         return
-    try:
-        conn = db_conn()
-        conn.execute('''
-            INSERT INTO request_log (ip_address, method, endpoint, user_agent, user_id)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (
-            request.remote_addr,
-            request.method,
-            request.path,
-            request.headers.get('User-Agent', '')[:500],
-            None
-        ))
-        conn.commit()
-        conn.close()
-    except Exception as e:
-        logging.error(f"request_log failed: {e}")
+    if REQUEST_LOG_SAMPLE < 1.0 and random.random() >= REQUEST_LOG_SAMPLE:
+        return
+    _enqueue_row(_req_log_q, 'request_log', (
+        request.remote_addr,
+        request.method,
+        request.path,
+        request.headers.get('User-Agent', '')[:500],  # stored as ua_id by the writer
+        None,
+        _utc_timestamp()
+    ))
 
 # --- IPFS Official Denylist Integration ---
+def iter_denylist_cids(chunks):
+    """Yield CIDs (bytes) from streamed Nginx denylist config (bytes chunks)"""
+    # finditer() over whole chunks keeps the scan loop in C; only the
+    # trailing partial line is carried over to the next chunk
+    tail = b''
+    for chunk in chunks:
+        buf = tail + chunk
+        cut = buf.rfind(b'\n') + 1
+        tail = buf[cut:]
+        for m in DENYLIST_LINE_RE.finditer(buf, 0, cut):
+            if m.group(1).startswith(DENYLIST_CID_PREFIXES):
+                yield m.group(1)
+    for m in DENYLIST_LINE_RE.finditer(tail):
+        if m.group(1).startswith(DENYLIST_CID_PREFIXES):
+            yield m.group(1)
+
 def download_ipfs_denylist():
-    """Download and parse official IPFS denylist from Nginx config format"""
+    """Download and parse official IPFS denylist from Nginx config format (streamed)"""
     try:
         logging.info(f"Downloading IPFS official denylist from {IPFS_DENYLIST_URL}")
-        r = requests.get(IPFS_DENYLIST_URL, timeout=30)
+        # Conditional GET: an unchanged denylist costs a 304 instead of a full body
+        headers = {}
+        etag = kv_get('denylist_etag')
+        if etag and os.path.exists(IPFS_DENYLIST_FILE):
+            headers['If-None-Match'] = etag
+        r = http_session.get(IPFS_DENYLIST_URL, headers=headers, stream=True, timeout=30)
+        
+        if r.status_code == 304:
+            r.close()
+            kv_set('denylist_last_sync', str(time.time()))
+            logging.info("IPFS denylist unchanged (304 Not Modified)")
+            return True
         
         if r.status_code != 200:
             logging.error(f"Failed to download denylist: HTTP {r.status_code}")
+            r.close()
             return False
         
-        logging.info(f"Downloaded {len(r.text)} bytes from IPFS denylist")
-        
         cids_found = 0
         lines_processed = 0
         
-        with open(IPFS_DENYLIST_FILE, 'w') as f:
-            f.write("# IPFS Official Denylist - Auto-generated\n")
-            f.write(f"# Source: {IPFS_DENYLIST_URL}\n")
-            f.write(f"# Downloaded: {datetime.now(timezone.utc).isoformat()}\n\n")
-            
-            for line in r.text.split('\n'):
-                lines_processed += 1
-                line = line.strip()
+        def counted_chunks():
+            nonlocal lines_processed
+            for chunk in r.iter_content(chunk_size=65536):
+                lines_processed += chunk.count(b'\n')
+                yield chunk
+        
+        # Write to a temp file and rename over the old list, so the blacklist
+        # watcher never parses a half-written file and a failed download
+        # leaves the previous list in place. The name is unique per call: the
+        # admin sync endpoint can run while the background updater downloads
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(IPFS_DENYLIST_FILE) or '.',
+            prefix=os.path.basename(IPFS_DENYLIST_FILE) + '.', suffix='.tmp')
+        try:
+            with r, os.fdopen(fd, 'wb') as f:
+                os.fchmod(f.fileno(), 0o644)  # mkstemp creates 0600
+                f.write(b"# IPFS Official Denylist - Auto-generated\n")
+                f.write(f"# Source: {IPFS_DENYLIST_URL}\n".encode())
+                f.write(f"# Downloaded: {datetime.now(timezone.utc).isoformat()}\n\n".encode())
                 
-                # Look for location blocks with ipfs/ipns paths
-                # Format: location ~ "^/ipfs/QmXXXX" {
-                if 'location' in line and ('"/ipfs/' in line or '"/ipns/' in line):
-                    try:
-                        # Extract CID from regex pattern
-                        if '"/ipfs/' in line:
-                            cid = line.split('"/ipfs/')[1].split('"')[0].split('/')[0]
-                        elif '"/ipns/' in line:
-                            cid = line.split('"/ipns/')[1].split('"')[0].split('/')[0]
-                        else:
-                            continue
-                        
-                        # Validate CID format (basic check)
-                        if cid and len(cid) > 10 and (cid.startswith('Qm') or cid.startswith('bafy') or cid.startswith('k51')):
-                            # Extract reason from comment above (if present)
-                            reason = 'ipfs-official-denylist'
-                            f.write(f"{cid} {reason}\n")
-                            cids_found += 1
-                            
-                    except (IndexError, ValueError) as e:
-                        logging.debug(f"Could not parse line {lines_processed}: {line[:50]} - {e}")
-                        continue
+                for cid in iter_denylist_cids(counted_chunks()):
+                    f.write(b"%s ipfs-official-denylist\n" % cid)
+                    cids_found += 1
+            os.replace(tmp_path, IPFS_DENYLIST_FILE)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
         
+        kv_set('denylist_etag', r.headers.get('ETag', ''))
+        kv_set('denylist_last_sync', str(time.time()))
         logging.info(f"Successfully parsed {cids_found} CIDs from {lines_processed} lines")
         audit_log('IPFS_DENYLIST_SYNC', details={
             'cids_found': cids_found,
@@ -234,59 +582,150 @@ def download_ipfs_denylist():
         logging.error(traceback.format_exc())
         return False
 
+# Set at exit so background loops wake up and return instead of sleeping on
+_stop = threading.Event()
+atexit.register(_stop.set)
+
+def _handle_sigterm(signum, frame):
+    """Dev server only: exit via SystemExit so atexit hooks (log flush) run"""
+    _stop.set()
+    sys.exit(0)
+
+def denylist_last_sync():
+    """Time of the last successful sync (304s included), else the file mtime, else None"""
+    last_sync = kv_get('denylist_last_sync')
+    if last_sync:
+        return float(last_sync)
+    try:
+        return os.stat(IPFS_DENYLIST_FILE).st_mtime
+    except FileNotFoundError:
+        return None
+
 def scheduled_denylist_update():
-    """Update denylist every 24h in background"""
+    """Sleep until the next 24h denylist sync is due, then run it"""
+    # The deadline is derived from the persisted last sync, so a restart does
+    # not re-download a fresh list and a failed attempt is retried after
+    # DENYLIST_RETRY_INTERVAL instead of a full day. Jitter spreads syncs of
+    # several gateway instances on the upstream CDN.
     while True:
-        time.sleep(86400)  # 24 hours
-        logging.info("Scheduled IPFS denylist update")
-        download_ipfs_denylist()
-        _cached_load_blacklist.cache_clear()
-
-# --- Blacklist (file-based with caching) ---
-@lru_cache(maxsize=1)
-def _cached_load_blacklist(cache_key):
-    """Cached blacklist loader - local blacklist only"""
+        try:
+            last_sync = denylist_last_sync() or 0
+        except Exception as e:
+            logging.error(f"Could not read last denylist sync time: {e}")
+            last_sync = 0
+        wait = max(DENYLIST_RETRY_INTERVAL, last_sync + DENYLIST_SYNC_INTERVAL - time.time())
+        if _stop.wait(wait + random.randint(0, 600)):
+            return
+        try:
+            update_denylist_if_stale()
+        except Exception as e:
+            logging.error(f"Scheduled IPFS denylist update failed: {e}")
+
+# --- Blacklist (merged in memory, rebuilt when a file changes) ---
+# 'lists' is a (frozenset of CIDs, {cid: reason}) pair swapped in as one object;
+# 'stats' is the precomputed (/admin/blacklist-stats body, ETag) pair
+_BL = {'mtime_local': -1, 'mtime_ipfs': -1, 'lists': (frozenset(), {}),
+       'stats': ({'total': 0, 'by_reason': {}, 'sample_cids': []}, '0-0')}
+_bl_lock = threading.Lock()
+
+def looks_like_cid(s):
+    """Cheap shape check: CIDs (v0 base58, v1 base32/base36) are long ASCII alphanumerics"""
+    return len(s) >= 10 and s.isascii() and s.isalnum()
+
+def _file_mtime(path):
+    """mtime in ns, or None if the file does not exist"""
     try:
-        blacklist = {}
-        with open(BLACKLIST_FILE, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
-                parts = line.split(maxsplit=1)
-                cid = parts[0]
-                reason = parts[1] if len(parts) > 1 else "policy_violation"
-                blacklist[cid] = reason
-        return blacklist
+        return os.stat(path).st_mtime_ns
     except FileNotFoundError:
-        return {}
-    except Exception as e:
-        logging.error(f"Error loading blacklist: {e}")
-        return {}
+        return None
 
-def load_blacklist():
-    """Return blacklist with cache - merged with IPFS official"""
-    cache_key = int(time.time() / BLACKLIST_CACHE_TIME)
-    local_blacklist = _cached_load_blacklist(cache_key)
-    
-    # Merge with official IPFS denylist
+def _parse_blacklist_file(path, default_reason):
+    """Parse 'CID reason' lines into a dict"""
+    blacklist = {}
     try:
-        if os.path.exists(IPFS_DENYLIST_FILE):
-            with open(IPFS_DENYLIST_FILE, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if not line or line.startswith('#'):
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return blacklist
+            # mmap the file and scan it with find(): no full in-memory copy and
+            # no str per line, only the CID/reason we keep get decoded
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                pos, size = 0, len(mm)
+                while pos < size:
+                    eol = mm.find(b'\n', pos)
+                    if eol == -1:
+                        eol = size
+                    line = mm[pos:eol].strip()
+                    pos = eol + 1
+                    if not line or line[:1] == b'#':
                         continue
-                    parts = line.split(maxsplit=1)
-                    cid = parts[0]
-                    reason = parts[1] if len(parts) > 1 else 'ipfs-official-denylist'
-                    
-                    if cid not in local_blacklist:
-                        local_blacklist[cid] = reason
+                    cid, _, reason = line.partition(b' ')
+                    if b'\t' in cid:  # hand-edited files sometimes use tabs
+                        cid, _, reason = line.partition(b'\t')
+                    reason = reason.strip()
+                    blacklist[cid.decode()] = reason.decode() if reason else default_reason
+    except FileNotFoundError:
+        pass
     except Exception as e:
-        logging.error(f"Error loading IPFS official denylist: {e}")
-    
-    return local_blacklist
+        logging.error(f"Error loading blacklist {path}: {e}")
+    return blacklist
+
+def _blacklist_stats(blacklist, mtime_local, mtime_ipfs):
+    """Aggregates for /admin/blacklist-stats plus an ETag derived from the file mtimes"""
+    stats = {
+        'total': len(blacklist),
+        'by_reason': dict(Counter(blacklist.values())),
+        'sample_cids': list(islice(blacklist, 10))
+    }
+    return stats, '%x-%x' % (mtime_local or 0, mtime_ipfs or 0)
+
+def refresh_blacklist():
+    """Re-parse local + IPFS official lists if either file's mtime changed"""
+    mtime_local = _file_mtime(BLACKLIST_FILE)
+    mtime_ipfs = _file_mtime(IPFS_DENYLIST_FILE)
+    if mtime_local == _BL['mtime_local'] and mtime_ipfs == _BL['mtime_ipfs']:
+        return _BL['lists']
+
+    with _bl_lock:
+        if mtime_local != _BL['mtime_local'] or mtime_ipfs != _BL['mtime_ipfs']:
+            # Local entries take precedence over the official denylist
+            blacklist = _parse_blacklist_file(IPFS_DENYLIST_FILE, 'ipfs-official-denylist')
+            blacklist.update(_parse_blacklist_file(BLACKLIST_FILE, 'policy_violation'))
+            cids = frozenset(blacklist)
+            _BL['stats'] = _blacklist_stats(blacklist, mtime_local, mtime_ipfs)
+            _BL['lists'] = (cids, blacklist)
+            _BL['mtime_local'] = mtime_local
+            _BL['mtime_ipfs'] = mtime_ipfs
+        return _BL['lists']
+
+def load_blacklist():
+    """
+    Return merged blacklist (local + IPFS official) as (cids, reasons).
+    cids is a frozenset for the membership test on every request; the
+    reasons dict is only needed on a hit. File changes are picked up by
+    blacklist_watcher(), so the request path does no stat() or parsing
+    unless the lists were never built or have been invalidated.
+    """
+    if _BL['mtime_local'] == -1:
+        return refresh_blacklist()
+    return _BL['lists']
+
+def blacklist_watcher():
+    """Rebuild the blacklist in the background when either file changes"""
+    while not _stop.wait(BLACKLIST_WATCH_INTERVAL):
+        try:
+            refresh_blacklist()
+        except Exception as e:
+            logging.error(f"Blacklist refresh failed: {e}")
+        # Same cadence for the jurisdiction: one kv_state read per interval
+        try:
+            sync_jurisdiction()
+        except Exception as e:
+            logging.error(f"Jurisdiction sync failed: {e}")
+
+def invalidate_blacklist():
+    """Force the next load_blacklist() call to re-parse both files"""
+    with _bl_lock:
+        _BL['mtime_local'] = _BL['mtime_ipfs'] = -1
 
 # --- Utility: proxy to IPFS HTTP gateway ---
 def proxy_ipfs_path(path, is_ipns=False, stream_timeout=120):
@@ -294,8 +733,15 @@ def proxy_ipfs_path(path, is_ipns=False, stream_timeout=120):
     kind = 'ipns' if is_ipns else 'ipfs'
     target = f"{IPFS_HTTP_GATEWAY}/{kind}/{path}"
     
+    # Forward Range so resumed/seeking downloads fetch only the missing part,
+    # and validators so a revalidating client gets the daemon's 304
+    fwd_headers = {h: request.headers[h] for h in PROXY_FORWARD_HEADERS if h in request.headers}
+    # Let upstream compress only what the client can decode, so the body can
+    # be relayed as-is instead of being decompressed here
+    fwd_headers['Accept-Encoding'] = request.headers.get('Accept-Encoding', 'identity')
+    
     try:
-        r = requests.get(target, stream=True, timeout=stream_timeout)
+        r = http_session.get(target, headers=fwd_headers, stream=True, timeout=stream_timeout)
     except requests.exceptions.Timeout:
         logging.error(f"IPFS gateway timeout for {target}")
         audit_log('IPFS_GATEWAY_TIMEOUT', details=target)
@@ -306,15 +752,26 @@ def proxy_ipfs_path(path, is_ipns=False, stream_timeout=120):
         return (f"IPFS gateway error: {e}", 503)
 
     if r.status_code == 404:
+        r.close()
         return ("Content not found on IPFS network", 404)
 
+    if r.status_code == 304:
+        r.close()
+        headers = {h: r.headers[h] for h in ('ETag', 'Last-Modified') if h in r.headers}
+        headers['Cache-Control'] = 'public, max-age=29030400, immutable'
+        return Response(status=304, headers=headers)
+
     def generate():
+        # Read urllib3's stream directly in 1 MiB blocks (no requests chunk layer)
         try:
-            for chunk in r.iter_content(chunk_size=8192):
+            for chunk in r.raw.stream(1 << 20, decode_content=False):
                 if chunk:
                     yield chunk
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, UpstreamHTTPError) as e:
             logging.error(f"Stream error from IPFS gateway: {e}")
+        finally:
+            # Also runs when the client disconnects mid-download
+            r.close()
 
     content_type = r.headers.get('Content-Type', 'application/octet-stream')
     headers = {
@@ -322,15 +779,75 @@ def proxy_ipfs_path(path, is_ipns=False, stream_timeout=120):
         'Cache-Control': 'public, max-age=29030400, immutable',
         'Access-Control-Allow-Origin': '*'
     }
-    return Response(generate(), status=r.status_code, headers=headers)
+    for h in ('Content-Range', 'Accept-Ranges', 'Content-Encoding', 'Content-Length',
+              'ETag', 'Last-Modified'):
+        if h in r.headers:
+            headers[h] = r.headers[h]
+    if 'Content-Encoding' in headers:
+        headers['Vary'] = 'Accept-Encoding'
+
+    # Large bodies: pass the upstream stream to wsgi.file_wrapper so the server
+    # reads it in 64 KiB blocks (or uses sendfile where it can)
+    content_length = r.headers.get('Content-Length', '')
+    if content_length.isdigit() and int(content_length) > PROXY_PASSTHROUGH_MIN_BYTES:
+        r.raw.decode_content = False
+        body = wrap_file(request.environ, r.raw, buffer_size=65536)
+        return Response(body, status=r.status_code, headers=headers, direct_passthrough=True)
+
+    return Response(generate(), status=r.status_code, headers=headers, direct_passthrough=True)
+
+# --- 451 blocked page ---
+# The page only varies by CID and request id for a given (jurisdiction, reason),
+# so it is rendered once per key with markers and split into byte fragments;
+# a blocked request then costs a few bytes concatenations instead of a render.
+_CID_MARK = '\x00cid\x00'
+_RID_MARK = '\x00rid\x00'
+_blocked_cache = {}
+BLOCKED_HEADERS = [
+    ('Content-Type', 'text/html; charset=utf-8'),
+    ('Cache-Control', 'no-cache, no-store, must-revalidate'),
+    ('X-Content-Blocked', '451-unavailable-for-legal-reasons'),
+]
+BLOCKED_TEST_HEADERS = BLOCKED_HEADERS[:2] + [('X-Content-Blocked', '451-test-mode')]
+
+def get_blocked_text(plugin, reason):
+    """Localized blocked page text from the active plugin (with fallback)"""
+    try:
+        if plugin:
+            return plugin.get_blocked_page_text(reason, language='pl')
+        raise Exception("No plugin available")
+    except Exception as e:
+        logging.warning(f"Could not get blocked page text from plugin: {e}")
+        return {
+            'title': '451 - Content Blocked',
+            'message': 'This content has been blocked due to legal reasons.',
+            'reason': reason,
+            'law': None
+        }
+
+def blocked_page_parts(reason):
+    """(prefix, mid, suffix) bytes of the 451 page around the CID and request id"""
+    plugin = _ACTIVE['plugin']
+    key = (plugin.country_code if plugin else None, reason)
+    parts = _blocked_cache.get(key)
+    if parts is None:
+        blocked_text = get_blocked_text(plugin, reason)
+        html_content = TPL_451.render(
+            title=blocked_text.get('title', '451 - Content Blocked'),
+            message=blocked_text.get('message', 'This content has been blocked.'),
+            reason=blocked_text.get('reason', reason),
+            law=blocked_text.get('law'),
+            cid=_CID_MARK,
+            request_id=_RID_MARK).encode('utf-8')
+        prefix, _, rest = html_content.partition(_CID_MARK.encode())
+        mid, _, suffix = rest.partition(_RID_MARK.encode())
+        parts = _blocked_cache[key] = (prefix, mid, suffix)
+    return parts
 
 # --- Routes ---
 @app.route('/')
 def index():
-    plugin = copyright_manager.get_active()
-    footer = plugin.get_footer_html() if plugin else ""
-    
-    return render_template('index.html', footer=footer)
+    return render_template('index.html', footer=_ACTIVE['footer'])
 
 @app.route('/ipfs/', defaults={'ipfs_path': None})
 @app.route('/ipfs/<path:ipfs_path>')
@@ -341,139 +858,33 @@ def ipfs_gateway(ipfs_path):
         if not ipfs_path:
             return redirect(url_for('index'))
 
-    # Extract CID
-    cid = ipfs_path.split('/')[0]
-    audit_log('CID_ACCESS', ip_address=request.remote_addr, cid=cid, details=f"path={ipfs_path}")
+    # Extract CID; crawler noise like favicon.ico is rejected here instead of
+    # costing a round trip to the daemon
+    cid = ipfs_path.partition('/')[0]
+    if not looks_like_cid(cid):
+        return ("Invalid CID", 400)
 
-    # Blacklist check
-    blacklist = load_blacklist()
+    # Blacklist check; only blocked requests get an audit row. Allowed ones
+    # are recorded in request_log, and only in the REQUEST_LOG_SAMPLE fraction
+    blacklist, reasons = load_blacklist()
     if cid in blacklist:
-        reason = blacklist[cid]
+        reason = reasons[cid]
         audit_log('BLACKLIST_HIT', ip_address=request.remote_addr, 
-                 cid=cid, details=f"blocked: {reason}")
-        
-        # Get localized blocked page from plugin (with fallback)
-        try:
-            plugin = copyright_manager.get_active()
-            if plugin:
-                blocked_text = plugin.get_blocked_page_text(reason, language='pl')
-            else:
-                raise Exception("No plugin available")
-        except Exception as e:
-            logging.warning(f"Could not get blocked page text from plugin: {e}")
-            blocked_text = {
-                'title': '451 - Content Blocked',
-                'message': 'This content has been blocked due to legal reasons.',
-                'reason': reason,
-                'law': None
-            }
-        
-        # Render template
-        html_content = render_template_string("""
-        <!doctype html><html><head>
-        <meta charset="utf-8">
-        <title>{{ title }}</title>
-        <style>
-            body {
-                font-family: Arial, sans-serif;
-                background: #2c3e50;
-                color: #ecf0f1;
-                text-align: center;
-                padding: 60px 20px;
-                margin: 0;
-            }
-            h1 {
-                color: #e74c3c;
-                font-size: 4em;
-                margin: 0;
-            }
-            .subtitle {
-                color: #95a5a6;
-                font-size: 1.2em;
-                margin: 20px 0;
-            }
-            .cid-box {
-                background: #34495e;
-                padding: 20px;
-                border-radius: 8px;
-                font-family: monospace;
-                word-break: break-all;
-                margin: 30px auto;
-                max-width: 600px;
-                font-size: 0.9em;
-            }
-            .reason-box {
-                background: rgba(231, 76, 60, 0.2);
-                padding: 15px;
-                border-radius: 8px;
-                margin: 20px auto;
-                max-width: 600px;
-                border: 2px solid #e74c3c;
-            }
-            a {
-                color: #4ecdc4;
-                text-decoration: none;
-                font-weight: bold;
-            }
-            a:hover {
-                text-decoration: underline;
-            }
-            .actions {
-                margin-top: 40px;
-            }
-            .ref {
-                margin-top: 60px;
-                color: #7f8c8d;
-                font-size: 0.8em;
-            }
-        </style>
-        </head>
-        <body>
-        <h1>⛔ 451</h1>
-        <div class="subtitle">{{ title }}</div>
+                 cid=cid, details=f"blocked: {reason}; path={ipfs_path}")
         
-        <div class="reason-box">
-            <strong>Reason:</strong> {{ reason }}
-        </div>
-        
-        <div class="cid-box">
-            <strong>Blocked CID:</strong><br>
-            {{ cid }}
-        </div>
-        
-        <p>{{ message }}</p>
-        
-        {% if law %}
-        <p style="font-size: 0.9em; color: #95a5a6;">{{ law }}</p>
-        {% endif %}
-        
-        <div class="actions">
-            <a href="/copyright">📋 Learn about our copyright policy</a>
-            <span style="color: #7f8c8d;"> | </span>
-            <a href="/">🏠 Return home</a>
-        </div>
-        
-        <div class="ref">
-            Reference: {{ request_id }}
-        </div>
-        </body></html>
-        """, 
-        title=blocked_text.get('title', '451 - Content Blocked'),
-        message=blocked_text.get('message', 'This content has been blocked.'),
-        reason=blocked_text.get('reason', reason),
-        law=blocked_text.get('law'),
-        cid=cid, 
-        request_id=uuid.uuid4().hex[:8])
-        
-        # Create response with explicit headers
-        response = Response(html_content, status=451, mimetype='text/html')
-        response.status_code = 451
-        response.status = '451 Unavailable For Legal Reasons'
-        response.headers['Content-Type'] = 'text/html; charset=utf-8'
-        response.headers['Content-Length'] = str(len(html_content.encode('utf-8')))
-        response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-        response.headers['X-Content-Blocked'] = '451-unavailable-for-legal-reasons'
-        return response
+        prefix, mid, suffix = blocked_page_parts(reason)
+        body = prefix + str(escape(cid)).encode('utf-8') + mid + request_id().encode() + suffix
+        return Response(body, status=451, headers=BLOCKED_HEADERS)
+
+    # A bare CID is immutable and the daemon tags it ETag "<cid>", so a client
+    # revalidating that tag can be answered without contacting the daemon.
+    # "*" is left to the daemon: only it knows whether the CID exists.
+    inm = request.if_none_match
+    if cid == ipfs_path and not inm.star_tag and inm.contains_weak(cid):
+        return Response(status=304, headers={
+            'ETag': f'"{cid}"',
+            'Cache-Control': 'public, max-age=29030400, immutable',
+        })
 
     return proxy_ipfs_path(ipfs_path, is_ipns=False)
 
@@ -483,20 +894,24 @@ def ipns_gateway(ipns_name):
     audit_log('IPNS_ACCESS', ip_address=request.remote_addr, details=f"name={ipns_name}")
     return proxy_ipfs_path(ipns_name, is_ipns=True)
 
-@app.route('/health')
-def health():
-    """Health check: IPFS daemon, database, and blacklist"""
+HEALTH_CACHE_SECONDS = 3
+_health = {'t': 0.0, 'status': None}
+_health_lock = threading.Lock()
+
+def _health_probe():
+    """Probe IPFS daemon, database, and blacklist"""
+    plugin = _ACTIVE['plugin']
     status = {
         'timestamp': datetime.now(timezone.utc).isoformat(),
         'ipfs': 'unknown',
         'database': 'unknown',
         'blacklist': 0,
-        'copyright_jurisdiction': copyright_manager.get_active().country_code if copyright_manager.get_active() else 'none'
+        'copyright_jurisdiction': plugin.country_code if plugin else 'none'
     }
     
-    # Check IPFS
+    # Check IPFS (HEAD: the status is enough, skip the directory listing body)
     try:
-        r = requests.get(f"{IPFS_HTTP_GATEWAY}/ipfs/QmYwAPJzv5CZsnA625s3Xf2nemtYgPpHdWEz79ojWnPbdG", timeout=4)
+        r = http_session.head(f"{IPFS_HTTP_GATEWAY}/ipfs/QmYwAPJzv5CZsnA625s3Xf2nemtYgPpHdWEz79ojWnPbdG", timeout=4)
         status['ipfs'] = 'ok' if r.status_code in (200, 301, 302, 404) else f'error({r.status_code})'
     except Exception as e:
         status['ipfs'] = f'error: {e}'
@@ -505,26 +920,36 @@ def health():
     try:
         conn = db_conn()
         conn.execute('SELECT 1').fetchone()
-        conn.close()
         status['database'] = 'ok'
     except Exception as e:
         status['database'] = f'error: {e}'
     
     # Blacklist stats
     try:
-        blacklist = load_blacklist()
+        blacklist, _ = load_blacklist()
         status['blacklist'] = len(blacklist)
     except Exception as e:
         status['blacklist'] = f'error: {e}'
 
+    return status
+
+@app.route('/health')
+def health():
+    """Health check, cached for a few seconds so frequent probes share one backend check"""
+    with _health_lock:
+        now = time.monotonic()
+        if _health['status'] is None or now - _health['t'] >= HEALTH_CACHE_SECONDS:
+            _health['status'] = _health_probe()
+            _health['t'] = now
+        status = _health['status']
     return jsonify(status)
 
 # --- Admin endpoints ---
 @app.route('/admin/reload-blacklist', methods=['POST'])
 def reload_blacklist():
     """Force reload blacklist"""
-    _cached_load_blacklist.cache_clear()
-    new_blacklist = load_blacklist()
+    invalidate_blacklist()
+    new_blacklist, _ = load_blacklist()
     audit_log('BLACKLIST_RELOAD', details=f"Reloaded {len(new_blacklist)} CIDs")
     return jsonify({"status": "reloaded", "count": len(new_blacklist)}), 200
 
@@ -534,8 +959,8 @@ def sync_ipfs_denylist():
     success = download_ipfs_denylist()
     
     if success:
-        _cached_load_blacklist.cache_clear()
-        new_blacklist = load_blacklist()
+        invalidate_blacklist()
+        new_blacklist, _ = load_blacklist()
         
         return jsonify({
             "status": "success",
@@ -548,18 +973,12 @@ def sync_ipfs_denylist():
 
 @app.route('/admin/blacklist-stats')
 def blacklist_stats():
-    """Blacklist statistics"""
-    blacklist = load_blacklist()
-    
-    reasons = {}
-    for reason in blacklist.values():
-        reasons[reason] = reasons.get(reason, 0) + 1
-    
-    return jsonify({
-        "total": len(blacklist),
-        "by_reason": reasons,
-        "sample_cids": list(blacklist.keys())[:10]
-    })
+    """Blacklist statistics (precomputed on rebuild; 304 while the lists are unchanged)"""
+    load_blacklist()
+    stats, etag = _BL['stats']
+    response = jsonify(stats)
+    response.set_etag(etag)
+    return response.make_conditional(request)
 
 @app.route('/admin/test-denylist-download')
 def test_denylist_download():
@@ -567,41 +986,33 @@ def test_denylist_download():
     import tempfile
     
     try:
-        # Download to temp file for testing
-        r = requests.get(IPFS_DENYLIST_URL, timeout=30)
+        r = http_session.get(IPFS_DENYLIST_URL, stream=True, timeout=30)
         
         if r.status_code != 200:
+            r.close()
             return jsonify({
                 'error': f'HTTP {r.status_code}',
                 'url': IPFS_DENYLIST_URL
             }), 500
         
-        # Parse in memory
-        cids_found = []
+        # Parse while streaming
+        bytes_downloaded = 0
         lines_processed = 0
         
-        for line in r.text.split('\n'):
-            lines_processed += 1
-            line = line.strip()
-            
-            if 'location' in line and ('"/ipfs/' in line or '"/ipns/' in line):
-                try:
-                    if '"/ipfs/' in line:
-                        cid = line.split('"/ipfs/')[1].split('"')[0].split('/')[0]
-                    elif '"/ipns/' in line:
-                        cid = line.split('"/ipns/')[1].split('"')[0].split('/')[0]
-                    else:
-                        continue
-                    
-                    if cid and len(cid) > 10:
-                        cids_found.append(cid)
-                except:
-                    continue
+        def counted_chunks():
+            nonlocal bytes_downloaded, lines_processed
+            for chunk in r.iter_content(chunk_size=65536):
+                bytes_downloaded += len(chunk)
+                lines_processed += chunk.count(b'\n')
+                yield chunk
+        
+        with r:
+            cids_found = [cid.decode() for cid in iter_denylist_cids(counted_chunks())]
         
         return jsonify({
             'status': 'success',
             'url': IPFS_DENYLIST_URL,
-            'bytes_downloaded': len(r.text),
+            'bytes_downloaded': bytes_downloaded,
             'lines_processed': lines_processed,
             'cids_found': len(cids_found),
             'sample_cids': cids_found[:10],
@@ -619,139 +1030,31 @@ def test_denylist_download():
 @app.route('/admin/test-blocked-page/<cid>')
 def test_blocked_page(cid):
     """Test what the blocked page returns"""
-    blacklist = load_blacklist()
+    _, reasons = load_blacklist()
     
     # Force block this CID for testing
-    reason = blacklist.get(cid, 'test-block')
+    reason = reasons.get(cid, 'test-block')
     
-    # Same logic as ipfs_gateway
-    try:
-        plugin = copyright_manager.get_active()
-        if plugin:
-            blocked_text = plugin.get_blocked_page_text(reason, language='pl')
-        else:
-            raise Exception("No plugin available")
-    except Exception as e:
-        blocked_text = {
-            'title': '451 - Content Blocked',
-            'message': 'This content has been blocked due to legal reasons.',
-            'reason': reason,
-            'law': None
-        }
-    
-    # Render template
-    html_content = render_template_string("""
-    <!doctype html><html><head>
-    <meta charset="utf-8">
-    <title>{{ title }}</title>
-    <style>
-        body {
-            font-family: Arial, sans-serif;
-            background: #2c3e50;
-            color: #ecf0f1;
-            text-align: center;
-            padding: 60px 20px;
-            margin: 0;
-        }
-        h1 {
-            color: #e74c3c;
-            font-size: 4em;
-            margin: 0;
-        }
-        .subtitle {
-            color: #95a5a6;
-            font-size: 1.2em;
-            margin: 20px 0;
-        }
-        .cid-box {
-            background: #34495e;
-            padding: 20px;
-            border-radius: 8px;
-            font-family: monospace;
-            word-break: break-all;
-            margin: 30px auto;
-            max-width: 600px;
-            font-size: 0.9em;
-        }
-        .reason-box {
-            background: rgba(231, 76, 60, 0.2);
-            padding: 15px;
-            border-radius: 8px;
-            margin: 20px auto;
-            max-width: 600px;
-            border: 2px solid #e74c3c;
-        }
-        a {
-            color: #4ecdc4;
-            text-decoration: none;
-            font-weight: bold;
-        }
-        a:hover {
-            text-decoration: underline;
-        }
-        .actions {
-            margin-top: 40px;
-        }
-        .ref {
-            margin-top: 60px;
-            color: #7f8c8d;
-            font-size: 0.8em;
-        }
-    </style>
-    </head>
-    <body>
-    <h1>⛔ 451</h1>
-    <div class="subtitle">{{ title }}</div>
-    
-    <div class="reason-box">
-        <strong>Reason:</strong> {{ reason }}
-    </div>
-    
-    <div class="cid-box">
-        <strong>Blocked CID:</strong><br>
-        {{ cid }}
-    </div>
-    
-    <p>{{ message }}</p>
-    
-    {% if law %}
-    <p style="font-size: 0.9em; color: #95a5a6;">{{ law }}</p>
-    {% endif %}
+    # Same text as ipfs_gateway, rendered in full (not cached) with the test banner
+    blocked_text = get_blocked_text(_ACTIVE['plugin'], reason)
     
-    <div class="actions">
-        <a href="/copyright">📋 Learn about our copyright policy</a>
-        <span style="color: #7f8c8d;"> | </span>
-        <a href="/">🏠 Return home</a>
-    </div>
-    
-    <div class="ref">
-        Reference: {{ request_id }} (TEST MODE)
-    </div>
-    </body></html>
-    """, 
-    title=blocked_text.get('title', '451 - Content Blocked'),
-    message=blocked_text.get('message', 'This content has been blocked.'),
-    reason=blocked_text.get('reason', reason),
-    law=blocked_text.get('law'),
-    cid=cid, 
-    request_id=uuid.uuid4().hex[:8])
+    html_content = TPL_451.render(
+        title=blocked_text.get('title', '451 - Content Blocked'),
+        message=blocked_text.get('message', 'This content has been blocked.'),
+        reason=blocked_text.get('reason', reason),
+        law=blocked_text.get('law'),
+        cid=cid,
+        request_id=request_id(),
+        test_mode=True).encode('utf-8')
     
-    # Create response with explicit headers
-    response = Response(html_content, status=451, mimetype='text/html')
-    response.status_code = 451
-    response.status = '451 Unavailable For Legal Reasons'
-    response.headers['Content-Type'] = 'text/html; charset=utf-8'
-    response.headers['Content-Length'] = str(len(html_content.encode('utf-8')))
-    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-    response.headers['X-Content-Blocked'] = '451-test-mode'
-    return response
+    return Response(html_content, status=451, headers=BLOCKED_TEST_HEADERS)
 
 @app.route('/admin/test-blacklist/<cid>')
 def test_blacklist(cid):
     """Test if CID is blocked"""
-    blacklist = load_blacklist()
+    blacklist, reasons = load_blacklist()
     is_blocked = cid in blacklist
-    reason = blacklist.get(cid, 'not found')
+    reason = reasons.get(cid, 'not found')
     
     return jsonify({
         'cid': cid,
@@ -762,11 +1065,15 @@ def test_blacklist(cid):
 
 @app.route('/admin/set-jurisdiction/<country_code>', methods=['POST'])
 def set_jurisdiction(country_code):
-    """Change active copyright jurisdiction"""
+    """Change active copyright jurisdiction (in every worker, see sync_jurisdiction)"""
     success = copyright_manager.set_country(country_code.upper())
+    # A failed switch can still change the active plugin (fallback to the
+    # default country), so re-read it either way
+    plugin = apply_jurisdiction()
+    if plugin:
+        kv_set('copyright_country', f"{COPYRIGHT_COUNTRY}:{plugin.country_code}")
     
     if success:
-        plugin = copyright_manager.get_active()
         audit_log('JURISDICTION_CHANGED', details=f"Changed to {country_code} - {plugin.law_name}")
         return jsonify({
             'status': 'success',
@@ -780,11 +1087,33 @@ def set_jurisdiction(country_code):
             'message': f'Plugin for {country_code} not found'
         }), 404
 
+def apply_jurisdiction():
+    """Pick up the manager's active plugin and drop caches built for the old one"""
+    plugin = refresh_active_plugin()
+    _blocked_cache.clear()
+    _fields_html_cache.clear()
+    return plugin
+
+def sync_jurisdiction():
+    """Follow a jurisdiction switch made in another gunicorn worker.
+
+    set_jurisdiction() stores '<COPYRIGHT_COUNTRY>:<active code>' in kv_state;
+    the switch outlives restarts until COPYRIGHT_COUNTRY itself is changed.
+    """
+    base, _, code = (kv_get('copyright_country') or '').partition(':')
+    if base != COPYRIGHT_COUNTRY or not code:
+        return
+    active = _ACTIVE['plugin']
+    if active is not None and active.country_code == code:
+        return
+    copyright_manager.set_country(code)
+    apply_jurisdiction()
+
 @app.route('/admin/list-jurisdictions')
 def list_jurisdictions():
     """List all available copyright jurisdictions"""
     jurisdictions = copyright_manager.list_available()
-    active = copyright_manager.get_active()
+    active = _ACTIVE['plugin']
     
     return jsonify({
         'available': jurisdictions,
@@ -795,122 +1124,64 @@ def list_jurisdictions():
 @app.route('/copyright')
 def copyright_policy():
     """Copyright policy page with jurisdiction-specific information"""
-    plugin = copyright_manager.get_active()
+    plugin = _ACTIVE['plugin']
     
     if not plugin:
         return "No copyright plugin active", 500
     
     template = plugin.get_notice_template()
-    footer = plugin.get_footer_html()
+    footer = _ACTIVE['footer']
     
-    return render_template_string("""
-    <!doctype html>
-    <html>
-    <head>
-        <meta charset="utf-8">
-        <title>Copyright Policy - {{ law_name }}</title>
-        <style>
-            body { font-family: Arial; max-width: 900px; margin: 40px auto; 
-                   background: #2c3e50; color: #ecf0f1; padding: 30px; }
-            h1 { color: #4ecdc4; }
-            h2 { color: #e74c3c; margin-top: 30px; }
-            pre { background: #34495e; padding: 20px; border-radius: 5px; 
-                  overflow-x: auto; white-space: pre-wrap; }
-            a { color: #4ecdc4; }
-            .badge { margin: 30px 0; }
-        </style>
-    </head>
-    <body>
-        <h1>Copyright Compliance Policy</h1>
-        <p><strong>Jurisdiction:</strong> {{ country }} - {{ law_name }}</p>
-        <p><strong>Legal Reference:</strong> {{ law_reference }}</p>
-        
-        <h2>How to Report Copyright Infringement</h2>
-        <p><a href="/copyright/report" style="font-size: 18px; font-weight: bold;">
-            📝 Submit Copyright Report</a></p>
-        
-        <h2>Notice Template</h2>
-        <pre>{{ template }}</pre>
-        
-        <div class="badge">{{ footer | safe }}</div>
-        
-        <p><a href="/">← Back to Home</a></p>
-    </body>
-    </html>
-    """, 
-    country=plugin.country_code,
-    law_name=plugin.law_name,
-    law_reference=plugin.law_reference,
-    template=template,
-    footer=footer)
+    return render_template('copyright_policy.html',
+        country=plugin.country_code,
+        law_name=plugin.law_name,
+        law_reference=plugin.law_reference,
+        template=template,
+        footer=footer)
+
+# Required fields are fixed per plugin, so the form inputs are rendered once
+# per jurisdiction instead of running the field loop on every GET
+_fields_html_cache = {}
+# Free-text fields get a <textarea>, everything else a one-line <input>
+_TEXTAREA_HINTS = ('description', 'statement', 'justification')
+
+def report_display_fields(fields):
+    """(name, label, is_textarea) for each form field name"""
+    return [(f, f.replace('_', ' ').title(), any(k in f for k in _TEXTAREA_HINTS))
+            for f in fields]
+
+def report_fields_html(plugin):
+    """Rendered <label>/<input> markup for the plugin's required fields"""
+    fields_html = _fields_html_cache.get(plugin.country_code)
+    if fields_html is None:
+        display_fields = report_display_fields(plugin.get_required_fields())
+        fields_html = Markup(render_template('copyright_report_fields.html',
+                                             display_fields=display_fields))
+        _fields_html_cache[plugin.country_code] = fields_html
+    return fields_html
 
 @app.route('/copyright/report', methods=['GET', 'POST'])
 def copyright_report():
     """Copyright takedown notice submission"""
-    plugin = copyright_manager.get_active()
+    plugin = _ACTIVE['plugin']
     
     if not plugin:
         return "No copyright plugin active", 500
     
+    cc, law, sla = plugin.country_code, plugin.law_name, plugin.get_sla_hours()
+    
     if request.method == 'GET':
-        template = plugin.get_notice_template()
-        required_fields = plugin.get_required_fields()
-        
-        return render_template_string("""
-        <!doctype html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <title>Report Copyright Infringement</title>
-            <style>
-                body { font-family: Arial; max-width: 900px; margin: 40px auto;
-                       background: #2c3e50; color: #ecf0f1; padding: 30px; }
-                h1 { color: #e74c3c; }
-                label { display: block; margin-top: 20px; color: #4ecdc4; font-weight: bold; }
-                input, textarea { width: 100%; padding: 10px; margin-top: 5px;
-                                 background: #34495e; border: none; color: #ecf0f1;
-                                 border-radius: 5px; }
-                button { background: #e74c3c; color: white; padding: 15px 30px;
-                        border: none; border-radius: 5px; margin-top: 30px;
-                        cursor: pointer; font-size: 16px; font-weight: bold; }
-                button:hover { background: #c0392b; }
-                .info { background: rgba(52, 152, 219, 0.2); padding: 15px;
-                       border-radius: 5px; margin: 20px 0; }
-            </style>
-        </head>
-        <body>
-            <h1>Report Copyright Infringement</h1>
-            <div class="info">
-                <strong>Jurisdiction:</strong> {{ country }} - {{ law }}<br>
-                <strong>Response Time:</strong> {{ sla }} hours
-            </div>
-            
-            <form method="POST">
-                {% for field in fields %}
-                <label for="{{ field }}">{{ field | replace('_', ' ') | title }}*</label>
-                {% if 'description' in field or 'statement' in field or 'justification' in field %}
-                <textarea name="{{ field }}" id="{{ field }}" rows="4" required></textarea>
-                {% else %}
-                <input type="text" name="{{ field }}" id="{{ field }}" required>
-                {% endif %}
-                {% endfor %}
-                
-                <button type="submit">Submit Report</button>
-            </form>
-            
-            <p style="margin-top: 30px;"><a href="/copyright" style="color:#4ecdc4;">← View Full Template</a></p>
-        </body>
-        </html>
-        """,
-        country=plugin.country_code,
-        law=plugin.law_name,
-        sla=plugin.get_sla_hours(),
-        fields=required_fields)
+        return render_template('copyright_report_form.html',
+            country=cc,
+            law=law,
+            sla=sla,
+            fields_html=report_fields_html(plugin))
     
     # POST handling
     notice_data = request.form.to_dict()
-    notice_data['timestamp'] = datetime.now(timezone.utc).isoformat()
-    notice_data['reference_id'] = f"{plugin.country_code}-{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')}"
+    now = utc_now()
+    notice_data['timestamp'] = now.isoformat()
+    notice_data['reference_id'] = f"{cc}-{now:%Y%m%d%H%M%S}"
     
     # Validate using plugin
     is_valid, error = plugin.validate_notice(notice_data)
@@ -922,28 +1193,16 @@ def copyright_report():
     audit_log('COPYRIGHT_REPORT',
              ip_address=request.remote_addr,
              cid=notice_data.get('infringing_cid'),
-             details={'jurisdiction': plugin.country_code, **notice_data})
+             details={**notice_data, 'jurisdiction': cc})
     
     # Send email if configured
-    if DMCA_SMTP_USER and DMCA_SMTP_PASS:
+    if DMCA_MAIL_ENABLED:
         send_copyright_mail(notice_data, plugin)
     
-    return render_template_string("""
-    <!doctype html>
-    <html>
-    <head><meta charset="utf-8"><title>Report Submitted</title></head>
-    <body style="font-family:Arial;max-width:900px;margin:40px auto;background:#2c3e50;color:#ecf0f1;padding:40px;">
-    <h1 style="color:#4ecdc4;">Copyright Report Submitted</h1>
-    <p><strong>Reference ID:</strong> {{ ref }}</p>
-    <p><strong>Jurisdiction:</strong> {{ jurisdiction }}</p>
-    <p>We will review and respond within <strong>{{ sla }} hours</strong>.</p>
-    <p><a href="/" style="color:#4ecdc4;">← Back to Home</a></p>
-    </body>
-    </html>
-    """, 
-    ref=notice_data['reference_id'],
-    jurisdiction=f"{plugin.country_code} ({plugin.law_name})",
-    sla=plugin.get_sla_hours())
+    return render_template('copyright_report_submitted.html',
+        ref=notice_data['reference_id'],
+        jurisdiction=f"{cc} ({law})",
+        sla=sla)
 
 # --- Static pages ---
 @app.route('/terms')
@@ -964,39 +1223,51 @@ def create_ssl_context():
         ('/etc/letsencrypt/live/servebeer.com/fullchain.pem', '/etc/letsencrypt/live/servebeer.com/privkey.pem'),
     ]
     
+    # load_cert_chain() opens the files itself; a missing file is just the
+    # next location, no separate exists() probe (and no TOCTOU window)
     for cert_path, key_path in cert_locations:
-        if os.path.exists(cert_path) and os.path.exists(key_path):
-            try:
-                context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
-                context.load_cert_chain(cert_path, key_path)
-                print(f"✅ SSL certificates loaded from: {cert_path}")
-                return context
-            except Exception as e:
-                print(f"⚠️  Failed to load SSL from {cert_path}: {e}")
-                continue
+        try:
+            # Server-side defaults: TLS >= 1.2, no compression, modern ciphers
+            context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            context.load_cert_chain(cert_path, key_path)
+            print(f"✅ SSL certificates loaded from: {cert_path}")
+            return context
+        except FileNotFoundError:
+            continue
+        except Exception as e:
+            print(f"⚠️  Failed to load SSL from {cert_path}: {e}")
+            continue
     
     print(f"⚠️  No valid SSL certificates found")
     print(f"   Tried locations:")
-    for cert, key in cert_locations:
-        exists_cert = "✓" if os.path.exists(cert) else "✗"
-        exists_key = "✓" if os.path.exists(key) else "✗"
-        print(f"   {exists_cert} {cert}")
-        print(f"   {exists_key} {key}")
+    exists = {path: os.path.exists(path) for pair in cert_locations for path in pair}
+    for path, found in exists.items():
+        print(f"   {'✓' if found else '✗'} {path}")
     
     return None
 
 def send_copyright_mail(data, plugin):
-    """Send copyright notice email"""
-    try:
-        msg = MIMEMultipart()
-        msg['From'] = data.get('contact_email', DMCA_SMTP_USER)
-        msg['To'] = DMCA_NOTIFY_TO
-        msg['Subject'] = f"Copyright Notice [{plugin.country_code}] - {data.get('infringing_cid', '')[:12]}"
+    """Queue a copyright notice email for the mail worker (returns immediately)"""
+    # Only plain values cross the thread boundary, never the plugin object
+    _mail_q.put((dict(data), plugin.country_code, plugin.law_name,
+                 plugin.law_reference, plugin.get_sla_hours()))
+    return True
+
+def build_copyright_mail(data, country, law, law_reference, sla):
+    """Build the copyright notice email message"""
+    msg = MIMEMultipart()
+    msg['From'] = data.get('contact_email', DMCA_SMTP_USER)
+    msg['To'] = DMCA_NOTIFY_TO
+    subject = f"Copyright Notice [{country}] - {(data.get('infringing_cid') or '')[:12]}"
+    # Validated CIDs are ASCII, so the charset does not need to be probed
+    msg['Subject'] = Header(subject, 'ascii' if subject.isascii() else 'utf-8')
 
-        body = f"""COPYRIGHT NOTICE RECEIVED
+    # One "field: value" line per form field (reference/timestamp are listed above)
+    details = "\n".join(f"{k}: {v}" for k, v in data.items() if k not in ('timestamp', 'reference_id'))
+    body = f"""COPYRIGHT NOTICE RECEIVED
 
-Jurisdiction: {plugin.country_code} - {plugin.law_name}
-Legal Reference: {plugin.law_reference}
+Jurisdiction: {country} - {law}
+Legal Reference: {law_reference}
 Reference ID: {data.get('reference_id')}
 Timestamp: {data.get('timestamp')}
 
@@ -1004,89 +1275,202 @@ Contact: {data.get('contact_email')}
 CID: {data.get('infringing_cid')}
 
 Full Details:
-{str(data)}
+{details}
 
 ---
-Response required within {plugin.get_sla_hours()} hours.
+Response required within {sla} hours.
 """
-        msg.attach(MIMEText(body, 'plain'))
+    msg.attach(MIMEText(body, 'plain', 'utf-8'))
+    return msg
 
-        server = smtplib.SMTP(DMCA_SMTP_HOST, DMCA_SMTP_PORT, timeout=10)
+# --- Copyright mail worker ---
+# SMTP (DNS + TCP + STARTTLS + AUTH) takes seconds, so notices are sent from
+# a background thread that keeps one session open between messages.
+_mail_q = queue.Queue()
+SMTP_IDLE_CHECK = 120  # seconds idle before the session is probed with NOOP
+
+def _smtp_connect():
+    server = smtplib.SMTP(DMCA_SMTP_HOST, DMCA_SMTP_PORT, timeout=10)
+    try:
         server.starttls()
         server.login(DMCA_SMTP_USER, DMCA_SMTP_PASS)
-        server.send_message(msg)
+    except Exception:
+        server.close()
+        raise
+    return server
+
+def _smtp_alive(server):
+    """NOOP probe (5s timeout) - False if the server has closed the session"""
+    try:
+        server.sock.settimeout(5)
+        ok = server.noop()[0] == 250
+        server.sock.settimeout(10)
+        return ok
+    except Exception:
+        return False
+
+def _smtp_close(server):
+    if server is None:
+        return
+    try:
         server.quit()
+    except Exception:
+        # QUIT failed on a dead session; still release the socket
+        server.close()
 
-        logging.info(f"Copyright notice email sent [{plugin.country_code}] to {DMCA_NOTIFY_TO}")
-        return True
-    except Exception as e:
-        logging.error(f"Failed to send copyright email: {e}")
+def _mail_worker():
+    """Send queued copyright notices, reconnecting if the server dropped us"""
+    server = None
+    last_success = 0.0
+    while True:
+        item = _mail_q.get()
+        try:
+            msg = build_copyright_mail(*item)
+        except Exception as e:
+            logging.error(f"Failed to build copyright email: {e}")
+            continue
+        # Servers drop idle sessions after a few minutes; check with a cheap
+        # NOOP and only pay for a new connect + TLS + AUTH if it is gone
+        if server is not None and time.monotonic() - last_success > SMTP_IDLE_CHECK:
+            if _smtp_alive(server):
+                last_success = time.monotonic()
+            else:
+                _smtp_close(server)
+                server = None
+        for attempt in range(2):
+            try:
+                if server is None:
+                    server = _smtp_connect()
+                server.send_message(msg)
+                last_success = time.monotonic()
+                logging.info(f"Copyright notice email sent to {DMCA_NOTIFY_TO}: {msg['Subject']}")
+                break
+            except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused) as e:
+                # Rejected by the server (bad auth, refused recipient, ...) -
+                # resending would only be rejected again
+                logging.error(f"Failed to send copyright email (rejected by server): {e}")
+                break
+            except smtplib.SMTPServerDisconnected as e:
+                # Dropped session - retry once on a new one
+                _smtp_close(server)
+                server = None
+                if attempt:
+                    logging.error(f"Failed to send copyright email: {e}")
+            except smtplib.SMTPException as e:
+                # SMTPException subclasses OSError, so it has to be caught
+                # before the socket errors below
+                logging.error(f"Failed to send copyright email: {e}")
+                _smtp_close(server)
+                server = None
+                break
+            except OSError as e:
+                # Socket error (timeout, reset, DNS) - retry once on a new session
+                _smtp_close(server)
+                server = None
+                if attempt:
+                    logging.error(f"Failed to send copyright email: {e}")
+            except Exception as e:
+                logging.error(f"Failed to send copyright email: {e}")
+                _smtp_close(server)
+                server = None
+                break
+
+# --- Background tasks ---
+
+_bg_started = False
+_bg_lock = threading.Lock()
+_denylist_lock_fd = None
+
+def _acquire_denylist_lock():
+    """Return True in exactly one process per host (gunicorn runs several workers)"""
+    global _denylist_lock_fd
+    fd = open(IPFS_DENYLIST_FILE + '.lock', 'w')
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        fd.close()
         return False
+    _denylist_lock_fd = fd  # held for the lifetime of the process
+    return True
 
-# --- Main ---
-if __name__ == '__main__':
+def update_denylist_if_stale():
+    """Download IPFS denylist if missing or not synced in the last 24h"""
+    last_sync = denylist_last_sync()
+    # A recorded sync does not help if the file itself has been deleted
+    if last_sync is None or not os.path.exists(IPFS_DENYLIST_FILE):
+        logging.info("Denylist file not found, downloading...")
+    else:
+        age = time.time() - last_sync
+        if age <= DENYLIST_SYNC_INTERVAL:
+            return
+        logging.info(f"Denylist last synced {int(age / 3600)} hours ago, updating...")
+    if download_ipfs_denylist():
+        invalidate_blacklist()
+    else:
+        logging.warning("Denylist download failed (will retry in an hour)")
+
+def start_background_tasks():
+    """Start DB log writers, mail worker, blacklist watcher and denylist updater.
+
+    Called from __main__ and from wsgi.py in every gunicorn worker; safe to
+    call more than once. The denylist updater and request_log retention
+    purge run in one process only.
+    """
+    global _bg_started
+    with _bg_lock:
+        if _bg_started:
+            return
+        _bg_started = True
+    
     setup_database()
+    sync_jurisdiction()
+    start_log_writers()
+    threading.Thread(target=_mail_worker, daemon=True).start()
+    threading.Thread(target=blacklist_watcher, daemon=True).start()
     
-    # Download IPFS denylist on startup
-    print(f"🔍 Checking IPFS official denylist...")
-    if not os.path.exists(IPFS_DENYLIST_FILE):
-        print(f"   Denylist file not found, downloading...")
-        success = download_ipfs_denylist()
-        if success:
-            print(f"   ✅ Downloaded successfully!")
-        else:
-            print(f"   ⚠️  Download failed (will try again in 24h)")
-    else:
-        file_age = time.time() - os.path.getmtime(IPFS_DENYLIST_FILE)
-        age_hours = int(file_age / 3600)
-        print(f"   Denylist age: {age_hours} hours")
-        if file_age > 86400:
-            print(f"   Denylist older than 24h, updating...")
-            success = download_ipfs_denylist()
-            if success:
-                print(f"   ✅ Updated successfully!")
-            else:
-                print(f"   ⚠️  Update failed (will try again in 24h)")
-        else:
-            print(f"   ✅ Denylist is fresh")
+    if _acquire_denylist_lock():
+        def _updater():
+            update_denylist_if_stale()
+            scheduled_denylist_update()
+        threading.Thread(target=_updater, daemon=True).start()
+        threading.Thread(target=retention_worker, daemon=True).start()
+        logging.info(f"Started background denylist updater (24h interval, pid {os.getpid()})")
+    
+    audit_log('SERVICE_STARTUP', details={
+        'host': APP_HOST, 
+        'port': APP_PORT,
+        'pid': os.getpid(),
+        'copyright_jurisdiction': COPYRIGHT_COUNTRY
+    })
+
+# --- Main ---
+if __name__ == '__main__':
+    # gunicorn installs its own handlers; only the dev server needs this
+    signal.signal(signal.SIGTERM, _handle_sigterm)
+    start_background_tasks()
     
     # Load and display blacklist stats
     try:
-        initial_blacklist = load_blacklist()
+        _, initial_blacklist = load_blacklist()
         print(f"📋 Blacklist loaded: {len(initial_blacklist)} total CIDs")
         
-        # Count by source
-        local_count = 0
-        official_count = 0
-        for reason in initial_blacklist.values():
-            if 'official' in reason:
-                official_count += 1
-            else:
-                local_count += 1
+        # Count by source (official entries all carry 'ipfs-official-denylist')
+        official_count = sum('official' in reason for reason in initial_blacklist.values())
+        local_count = len(initial_blacklist) - official_count
         
         print(f"   • Local: {local_count} CIDs")
         print(f"   • Official IPFS: {official_count} CIDs")
     except Exception as e:
         print(f"⚠️  Error loading blacklist: {e}")
     
-    # Start background denylist updater
-    update_thread = threading.Thread(target=scheduled_denylist_update, daemon=True)
-    update_thread.start()
-    print(f"⏰ Started background denylist updater (24h interval)")
-    
-    logging.info("Starting IPFS Gateway Flask app")
-    audit_log('SERVICE_STARTUP', details={
-        'host': APP_HOST, 
-        'port': APP_PORT,
-        'copyright_jurisdiction': COPYRIGHT_COUNTRY
-    })
+    logging.info("Starting IPFS Gateway Flask app (development server; use gunicorn in production)")
     
     ssl_ctx = create_ssl_context()
     if ssl_ctx:
         print(f"\n🔒 Starting with SSL on port 443...")
         print(f"📋 Copyright jurisdiction: {COPYRIGHT_COUNTRY}")
-        app.run(host='0.0.0.0', port=443, ssl_context=ssl_ctx, debug=False)
+        app.run(host='0.0.0.0', port=443, ssl_context=ssl_ctx, debug=False, threaded=True)
     else:
         print(f"\n🌐 Starting HTTP on port {APP_PORT}...")
         print(f"📋 Copyright jurisdiction: {COPYRIGHT_COUNTRY}")
-        app.run(host=APP_HOST, port=APP_PORT, debug=False)
+        app.run(host=APP_HOST, port=APP_PORT, debug=False, threaded=True)
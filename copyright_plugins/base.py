@@ -3,49 +3,94 @@ Base class for copyright compliance plugins.
 Each country/region can implement its own plugin with specific legal requirements.
 """
 
+import inspect
+import re
 from abc import ABC, abstractmethod
-from typing import Dict, Optional, List
+from typing import ClassVar, Dict, Mapping, Optional, Tuple
+
+# Shared notice validation helpers
+CID_PREFIXES = ('Qm', 'bafy', 'k51')  # CIDv0, CIDv1 (base32), IPNS key (base36)
+EMAIL_RE = re.compile(r'[^@\s]+@[^@\s]+\.[^@\s]+')  # use with fullmatch()
+# Full-length CID (CIDv0 is 46 chars, v1 longer); use with fullmatch()
+CID_RE = re.compile(r'[A-Za-z0-9]{46,}')
 
 
 class CopyrightPlugin(ABC):
     """Abstract base class for country-specific copyright compliance"""
     
-    @property
-    @abstractmethod
-    def country_code(self) -> str:
-        """ISO country code (e.g., 'US', 'PL', 'FR', 'EU')"""
-        pass
+    # Plugins hold no per-instance state; subclasses declare __slots__ = ()
+    # too, so instances carry no __dict__
+    __slots__ = ()
     
-    @property
-    @abstractmethod
-    def law_name(self) -> str:
-        """Name of the copyright law/act (e.g., 'DMCA', 'DSA', 'Droit d'auteur')"""
-        pass
+    # Plain class attributes, set by every plugin
+    country_code: ClassVar[str]   # ISO country code (e.g., 'US', 'PL', 'FR', 'EU')
+    law_name: ClassVar[str]       # Name of the law/act (e.g., 'DMCA', 'DSA', 'Droit d'auteur')
+    law_reference: ClassVar[str]  # Legal reference (e.g., '17 U.S.C. § 512', 'Regulation 2022/2065')
     
-    @property
-    @abstractmethod
-    def law_reference(self) -> str:
-        """Legal reference (e.g., '17 U.S.C. § 512', 'Regulation 2022/2065')"""
-        pass
+    # Notice validation: the submitter email field and the error messages,
+    # overridden by plugins with other field names or in other languages
+    EMAIL_FIELD: ClassVar[str] = 'contact_email'
+    INVALID_CID_MSG: ClassVar[str] = "Invalid IPFS CID format"
+    INVALID_EMAIL_MSG: ClassVar[str] = "Invalid email address"
+    MISSING_FIELD_MSG: ClassVar[str] = "Missing required field: {field}"
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Abstract intermediate bases leave these to their concrete subclasses
+        if inspect.isabstract(cls):
+            return
+        for attr in ('country_code', 'law_name', 'law_reference'):
+            if not isinstance(getattr(cls, attr, None), str):
+                raise TypeError(f"{cls.__name__} must define class attribute '{attr}'")
     
+    # The template/footer getters return static text; plugins keep it in
+    # module-level constants so it is built once at import, not per call
     @abstractmethod
     def get_notice_template(self) -> str:
         """Return the copyright notice template in markdown format"""
         pass
     
-    @abstractmethod
     def validate_notice(self, notice_data: Dict) -> tuple[bool, Optional[str]]:
         """
         Validate a copyright notice submission.
         Returns: (is_valid, error_message)
         """
-        pass
+        # Plugins with jurisdiction-specific rules override this and call
+        # check_notice() for the shared checks
+        return self.check_notice(notice_data)
     
     @abstractmethod
-    def get_required_fields(self) -> List[str]:
-        """Return list of required form fields for this jurisdiction"""
+    def get_required_fields(self) -> Tuple[str, ...]:
+        """Return required form fields for this jurisdiction (form order)"""
         pass
     
+    def missing_field(self, notice_data: Dict) -> Optional[str]:
+        """First required field (in form order) that is absent or empty, else None"""
+        # Browsers submit every input, so a key check alone would miss blank
+        # fields; the values have to be looked at
+        for field in self.get_required_fields():
+            if not notice_data.get(field):
+                return field
+        return None
+    
+    def check_notice(self, notice_data: Dict) -> tuple[bool, Optional[str]]:
+        """Shared validate_notice() checks: CID and email format, then required fields"""
+        # Format checks first: a mistyped CID or email is the usual failure;
+        # empty values fall through to the required-field check below
+        cid = notice_data.get('infringing_cid', '')
+        if cid and not (cid.startswith(CID_PREFIXES) and CID_RE.fullmatch(cid)):
+            return False, self.INVALID_CID_MSG
+        
+        email = notice_data.get(self.EMAIL_FIELD, '')
+        if email and not EMAIL_RE.fullmatch(email):
+            return False, self.INVALID_EMAIL_MSG
+        
+        field = self.missing_field(notice_data)
+        if field:
+            return False, self.MISSING_FIELD_MSG.format(field=field)
+        
+        return True, None
+    
     @abstractmethod
     def get_sla_hours(self) -> int:
         """Return required response time in hours"""
@@ -62,9 +107,9 @@ class CopyrightPlugin(ABC):
         pass
     
     @abstractmethod
-    def get_takedown_reasons(self) -> Dict[str, str]:
+    def get_takedown_reasons(self) -> Mapping[str, str]:
         """
-        Return dict of valid takedown reasons for this jurisdiction.
+        Return read-only mapping of valid takedown reasons for this jurisdiction.
         Format: {'reason_code': 'Human-readable description'}
         """
         pass
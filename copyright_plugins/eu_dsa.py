@@ -3,36 +3,11 @@ EU DSA (Digital Services Act) Plugin
 Regulation (EU) 2022/2065
 """
 
-from typing import Dict, Optional, List
+from types import MappingProxyType
+from typing import Dict, Mapping, Tuple
 from .base import CopyrightPlugin
 
-
-class EUDSAPlugin(CopyrightPlugin):
-    """DSA compliance plugin for European Union"""
-    
-    @property
-    def country_code(self) -> str:
-        return "EU"
-    
-    @property
-    def law_name(self) -> str:
-        return "DSA (Digital Services Act)"
-    
-    @property
-    def law_reference(self) -> str:
-        return "Regulation (EU) 2022/2065"
-    
-    def get_required_fields(self) -> List[str]:
-        return [
-            'complainant_name',
-            'complainant_email',
-            'infringing_cid',
-            'illegal_content_explanation',
-            'good_faith_statement'
-        ]
-    
-    def get_notice_template(self) -> str:
-        return """
+_NOTICE_TEMPLATE = """
 # DSA Notice and Action Mechanism
 
 ## Article 16 Requirements - Notification of Illegal Content
@@ -65,32 +40,8 @@ class EUDSAPlugin(CopyrightPlugin):
 
 **Appeal:** If you disagree with our decision, you can file a complaint within 6 months.
 """
-    
-    def validate_notice(self, notice_data: Dict) -> tuple[bool, Optional[str]]:
-        """Validate DSA notice (less strict than DMCA)"""
-        
-        required = self.get_required_fields()
-        for field in required:
-            if not notice_data.get(field):
-                return False, f"Missing required field: {field}"
-        
-        # Validate CID
-        cid = notice_data.get('infringing_cid', '')
-        if not (cid.startswith('Qm') or cid.startswith('bafy') or cid.startswith('k51')):
-            return False, "Invalid IPFS CID format"
-        
-        # Validate email
-        email = notice_data.get('complainant_email', '')
-        if '@' not in email:
-            return False, "Invalid email address"
-        
-        return True, None
-    
-    def get_sla_hours(self) -> int:
-        return 24  # DSA requires faster response than DMCA
-    
-    def get_counter_notice_template(self) -> str:
-        return """
+
+_COUNTER_NOTICE_TEMPLATE = """
 # DSA Complaint (Article 20)
 
 ## Right to Complain About Content Moderation Decisions
@@ -117,9 +68,8 @@ class EUDSAPlugin(CopyrightPlugin):
 
 **Further Appeal:** If unsatisfied, you may submit the dispute to a certified out-of-court dispute settlement body.
 """
-    
-    def get_footer_html(self) -> str:
-        return """
+
+_FOOTER_HTML = """
 <div class="dsa-badge" style="background:#003399;color:white;padding:15px;border-radius:8px;text-align:center;margin:30px 0;border:2px solid #001a66;">
     🇪🇺 DSA Compliant Gateway (European Union)<br>
     <a href="/copyright/report" style="color:white;text-decoration:underline;">Report Illegal Content</a> | 
@@ -128,15 +78,50 @@ class EUDSAPlugin(CopyrightPlugin):
     <small>Regulation (EU) 2022/2065 compliant</small>
 </div>
 """
+
+
+class EUDSAPlugin(CopyrightPlugin):
+    """DSA compliance plugin for European Union"""
+    
+    __slots__ = ()
     
-    def get_takedown_reasons(self) -> Dict[str, str]:
-        return {
-            'copyright': 'Copyright Infringement',
-            'illegal_content': 'Illegal Content (DSA)',
-            'hate_speech': 'Hate Speech',
-            'csam': 'Child Sexual Abuse Material',
-            'terrorism': 'Terrorist Content'
-        }
+    country_code = "EU"
+    law_name = "DSA (Digital Services Act)"
+    law_reference = "Regulation (EU) 2022/2065"
+    
+    REQUIRED_FIELDS = (
+        'complainant_name',
+        'complainant_email',
+        'infringing_cid',
+        'illegal_content_explanation',
+        'good_faith_statement',
+    )
+    TAKEDOWN_REASONS = MappingProxyType({
+        'copyright': 'Copyright Infringement',
+        'illegal_content': 'Illegal Content (DSA)',
+        'hate_speech': 'Hate Speech',
+        'csam': 'Child Sexual Abuse Material',
+        'terrorism': 'Terrorist Content',
+    })
+    EMAIL_FIELD = 'complainant_email'
+    
+    def get_required_fields(self) -> Tuple[str, ...]:
+        return self.REQUIRED_FIELDS
+    
+    def get_notice_template(self) -> str:
+        return _NOTICE_TEMPLATE
+    
+    def get_sla_hours(self) -> int:
+        return 24  # DSA requires faster response than DMCA
+    
+    def get_counter_notice_template(self) -> str:
+        return _COUNTER_NOTICE_TEMPLATE
+    
+    def get_footer_html(self) -> str:
+        return _FOOTER_HTML
+    
+    def get_takedown_reasons(self) -> Mapping[str, str]:
+        return self.TAKEDOWN_REASONS
     
     def get_blocked_page_text(self, reason: str, language: str = 'en') -> Dict[str, str]:
         if language == 'pl':
@@ -157,3 +142,6 @@ class EUDSAPlugin(CopyrightPlugin):
                 'action': 'If you believe this removal was incorrect, you may file a complaint.',
                 'link': '/dsa-complaint'
             }
+
+
+PLUGIN_CLASS = EUDSAPlugin
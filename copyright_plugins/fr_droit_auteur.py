@@ -3,40 +3,11 @@ France Droit d'auteur Plugin
 Code de la propriété intellectuelle (CPI)
 """
 
-from typing import Dict, Optional, List
+from types import MappingProxyType
+from typing import Dict, Mapping, Tuple
 from .base import CopyrightPlugin
 
-
-class FranceDroitAuteurPlugin(CopyrightPlugin):
-    """Plugin for French copyright law (droit d'auteur)"""
-    
-    @property
-    def country_code(self) -> str:
-        return "FR"
-    
-    @property
-    def law_name(self) -> str:
-        return "Droit d'auteur (CPI)"
-    
-    @property
-    def law_reference(self) -> str:
-        return "Code de la propriété intellectuelle (Articles L111-1 à L343-7)"
-    
-    def get_required_fields(self) -> List[str]:
-        return [
-            'author_name',
-            'contact_email',
-            'contact_address',
-            'infringing_cid',
-            'work_description',
-            'moral_rights_statement',
-            'economic_rights_statement',
-            'good_faith_statement',
-            'signature'
-        ]
-    
-    def get_notice_template(self) -> str:
-        return """
+_NOTICE_TEMPLATE = """
 # Notification de violation du droit d'auteur
 
 ## Code de la propriété intellectuelle (France)
@@ -96,39 +67,8 @@ class FranceDroitAuteurPlugin(CopyrightPlugin):
 
 **Note:** Ce formulaire prend en compte les spécificités du droit français, notamment l'existence de droits moraux distincts des droits patrimoniaux.
 """
-    
-    def validate_notice(self, notice_data: Dict) -> tuple[bool, Optional[str]]:
-        """Validate French copyright notice"""
-        
-        for field in self.get_required_fields():
-            if not notice_data.get(field):
-                return False, f"Champ requis manquant: {field}"
-        
-        # Validate CID
-        cid = notice_data.get('infringing_cid', '')
-        if not (cid.startswith('Qm') or cid.startswith('bafy') or cid.startswith('k51')):
-            return False, "Format CID IPFS invalide"
-        
-        # Validate email
-        email = notice_data.get('contact_email', '')
-        if '@' not in email:
-            return False, "Adresse email invalide"
-        
-        # Check moral rights statement (specific to French law)
-        if not notice_data.get('moral_rights_statement'):
-            return False, "La déclaration sur les droits moraux est requise (spécificité du droit français)"
-        
-        # Check economic rights
-        if not notice_data.get('economic_rights_statement'):
-            return False, "La déclaration sur les droits patrimoniaux est requise"
-        
-        return True, None
-    
-    def get_sla_hours(self) -> int:
-        return 72  # 3 days - French law doesn't specify, but reasonable timeframe
-    
-    def get_counter_notice_template(self) -> str:
-        return """
+
+_COUNTER_NOTICE_TEMPLATE = """
 # Contestation de retrait - Droit d'auteur français
 
 ## Vous contestez un retrait de contenu
@@ -171,9 +111,8 @@ Vous pouvez invoquer:
 
 **Recours:** Si vous n'êtes pas satisfait de notre décision, vous pouvez saisir le tribunal judiciaire compétent.
 """
-    
-    def get_footer_html(self) -> str:
-        return """
+
+_FOOTER_HTML = """
 <div class="fr-copyright-badge" style="background:#0055A4;color:white;padding:15px;border-radius:8px;text-align:center;margin:30px 0;border:2px solid #003580;">
     🇫🇷 Conformité Droit d'auteur français<br>
     <a href="/copyright/report" style="color:white;text-decoration:underline;">Signaler une violation</a><br>
@@ -181,14 +120,55 @@ Vous pouvez invoquer:
     <small>Droits moraux: perpétuels, inaliénables et imprescriptibles</small>
 </div>
 """
+
+
+class FranceDroitAuteurPlugin(CopyrightPlugin):
+    """Plugin for French copyright law (droit d'auteur)"""
     
-    def get_takedown_reasons(self) -> Dict[str, str]:
-        return {
-            'droit_auteur': 'Violation du droit d\'auteur',
-            'droit_moral': 'Atteinte aux droits moraux',
-            'contrefacon': 'Contrefaçon',
-            'droit_voisin': 'Violation des droits voisins'
-        }
+    __slots__ = ()
+    
+    country_code = "FR"
+    law_name = "Droit d'auteur (CPI)"
+    law_reference = "Code de la propriété intellectuelle (Articles L111-1 à L343-7)"
+    
+    REQUIRED_FIELDS = (
+        'author_name',
+        'contact_email',
+        'contact_address',
+        'infringing_cid',
+        'work_description',
+        'moral_rights_statement',
+        'economic_rights_statement',
+        'good_faith_statement',
+        'signature',
+    )
+    TAKEDOWN_REASONS = MappingProxyType({
+        'droit_auteur': 'Violation du droit d\'auteur',
+        'droit_moral': 'Atteinte aux droits moraux',
+        'contrefacon': 'Contrefaçon',
+        'droit_voisin': 'Violation des droits voisins',
+    })
+    INVALID_CID_MSG = "Format CID IPFS invalide"
+    INVALID_EMAIL_MSG = "Adresse email invalide"
+    MISSING_FIELD_MSG = "Champ requis manquant: {field}"
+    
+    def get_required_fields(self) -> Tuple[str, ...]:
+        return self.REQUIRED_FIELDS
+    
+    def get_notice_template(self) -> str:
+        return _NOTICE_TEMPLATE
+    
+    def get_sla_hours(self) -> int:
+        return 72  # 3 days - French law doesn't specify, but reasonable timeframe
+    
+    def get_counter_notice_template(self) -> str:
+        return _COUNTER_NOTICE_TEMPLATE
+    
+    def get_footer_html(self) -> str:
+        return _FOOTER_HTML
+    
+    def get_takedown_reasons(self) -> Mapping[str, str]:
+        return self.TAKEDOWN_REASONS
     
     def get_blocked_page_text(self, reason: str, language: str = 'fr') -> Dict[str, str]:
         return {
@@ -200,3 +180,6 @@ Vous pouvez invoquer:
             'link': '/copyright/counter-notice',
             'note': 'Note: Le droit moral français est perpétuel et inaliénable (Article L121-1 CPI)'
         }
+
+
+PLUGIN_CLASS = FranceDroitAuteurPlugin
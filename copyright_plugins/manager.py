@@ -5,57 +5,127 @@ Automatically loads and manages country-specific copyright plugins.
 
 import os
 import importlib
+import inspect
 import logging
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple, Type
 from .base import CopyrightPlugin
 
+# Package files that are not plugins. copyright_plugin_base.py and
+# copyright_plugin_manager.py are older standalone copies of base/manager.
+_SKIP = frozenset({
+    '__init__.py', 'base.py', 'manager.py',
+    'copyright_plugin_base.py', 'copyright_plugin_manager.py',
+})
+
+# Modules whose import failed (missing optional dependency); later re-scans
+# skip them instead of retrying the import - restart to pick up a fix
+_FAILED_MODULES = set()
+
+# Discovered plugin classes per (plugins dir, dir mtime): building another
+# manager reuses the scan until a plugin file is added or removed
+_PLUGIN_CLASS_CACHE: Dict[Tuple[str, int], Dict[str, Type[CopyrightPlugin]]] = {}
+
+
+def discover_plugin_classes() -> Dict[str, Type[CopyrightPlugin]]:
+    """
+    Import plugin modules and return {country_code: plugin class}.
+    A plugin module exports its class as module attribute PLUGIN_CLASS;
+    modules without it (older third-party plugins) are scanned for a
+    concrete CopyrightPlugin subclass instead.
+    """
+    plugins_dir = os.path.dirname(__file__)
+    key = (plugins_dir, os.stat(plugins_dir).st_mtime_ns)
+    classes = _PLUGIN_CLASS_CACHE.get(key)
+    if classes is not None:
+        return classes
+    
+    classes = {}
+    with os.scandir(plugins_dir) as entries:
+        filenames = [e.name for e in entries
+                     if e.name.endswith('.py') and e.name not in _SKIP and e.is_file()]
+    
+    for filename in sorted(filenames):
+        module_name = filename[:-3]
+        if module_name in _FAILED_MODULES:
+            continue
+        
+        try:
+            module = importlib.import_module(f'copyright_plugins.{module_name}')
+            
+            plugin_class = getattr(module, 'PLUGIN_CLASS', None)
+            if plugin_class is not None:
+                if not (isinstance(plugin_class, type) and issubclass(plugin_class, CopyrightPlugin)):
+                    raise TypeError("PLUGIN_CLASS is not a CopyrightPlugin subclass")
+                classes[plugin_class.country_code] = plugin_class
+                continue
+            
+            for attr_name in dir(module):
+                attr = getattr(module, attr_name)
+                if (isinstance(attr, type) and 
+                    issubclass(attr, CopyrightPlugin) and 
+                    not inspect.isabstract(attr)):
+                    
+                    classes[attr.country_code] = attr
+        
+        except ImportError as e:
+            # A plugin needing an uninstalled package is skipped, not fatal
+            _FAILED_MODULES.add(module_name)
+            logging.error(f"❌ Failed to load plugin {module_name}: {e}")
+        except Exception:
+            # Syntax errors and bugs in plugin code stop startup instead of
+            # silently dropping a jurisdiction
+            logging.exception(f"❌ Plugin {module_name} is broken")
+            raise
+    
+    if classes:
+        logging.info(f"✅ Loaded {len(classes)} copyright plugins: " +
+                     ", ".join(f"{code} ({cls.law_name})" for code, cls in classes.items()))
+    
+    _PLUGIN_CLASS_CACHE.clear()
+    _PLUGIN_CLASS_CACHE[key] = classes
+    return classes
+
 
 class CopyrightPluginManager:
     """Manages copyright compliance plugins for different jurisdictions"""
     
     def __init__(self, default_country: str = "US"):
+        # Classes of all discovered plugins; instances are created on first use
+        # (a gateway normally serves a single jurisdiction for its lifetime)
+        self.plugin_classes: Dict[str, Type[CopyrightPlugin]] = {}
         self.plugins: Dict[str, CopyrightPlugin] = {}
+        self._available: Optional[Dict[str, str]] = None
         self.active_plugin: Optional[CopyrightPlugin] = None
         self.default_country = default_country
         self.load_plugins()
         self.set_country(default_country)
+        # Without the default plugin there is no footer, policy page or
+        # report form - refuse to start rather than serve half a gateway
+        if self.active_plugin is None:
+            raise RuntimeError(f"Copyright plugin for default country {default_country} failed to load")
     
     def load_plugins(self):
-        """Automatically discover and load all plugins"""
-        plugins_dir = os.path.dirname(__file__)
-        
-        for filename in os.listdir(plugins_dir):
-            if filename.endswith('.py') and filename not in ['__init__.py', 'base.py', 'manager.py']:
-                module_name = filename[:-3]
-                
-                try:
-                    module = importlib.import_module(f'copyright_plugins.{module_name}')
-                    
-                    for attr_name in dir(module):
-                        attr = getattr(module, attr_name)
-                        if (isinstance(attr, type) and 
-                            issubclass(attr, CopyrightPlugin) and 
-                            attr != CopyrightPlugin):
-                            
-                            plugin = attr()
-                            self.plugins[plugin.country_code] = plugin
-                            logging.info(f"✅ Loaded copyright plugin: {plugin.country_code} ({plugin.law_name})")
-                
-                except Exception as e:
-                    logging.error(f"❌ Failed to load plugin {module_name}: {e}")
+        """Automatically discover all plugins (instantiated lazily by get_plugin)"""
+        self.plugin_classes = dict(discover_plugin_classes())
+        self.plugins = {}
+        self._available = None
     
     def set_country(self, country_code: str) -> bool:
         """Set the active country/jurisdiction"""
-        country_code = country_code.upper()
+        # Codes usually arrive upper-case already (config, admin endpoint)
+        if not country_code.isupper():
+            country_code = country_code.upper()
         
-        if country_code in self.plugins:
-            self.active_plugin = self.plugins[country_code]
+        plugin = self.get_plugin(country_code)
+        if plugin:
+            self.active_plugin = plugin
             logging.info(f"🌍 Active copyright jurisdiction: {country_code} - {self.active_plugin.law_name}")
             return True
         else:
             logging.warning(f"⚠️  No plugin for {country_code}, using default: {self.default_country}")
-            if self.default_country in self.plugins:
-                self.active_plugin = self.plugins[self.default_country]
+            default = self.get_plugin(self.default_country)
+            if default:
+                self.active_plugin = default
                 return False
             else:
                 logging.error(f"❌ Default country {self.default_country} plugin not found!")
@@ -66,15 +136,30 @@ class CopyrightPluginManager:
         return self.active_plugin
     
     def get_plugin(self, country_code: str) -> Optional[CopyrightPlugin]:
-        """Get a specific plugin by country code"""
-        return self.plugins.get(country_code.upper())
+        """Get a specific plugin by country code (instantiated on first request)"""
+        if not country_code.isupper():
+            country_code = country_code.upper()
+        plugin = self.plugins.get(country_code)
+        if plugin is None:
+            plugin_class = self.plugin_classes.get(country_code)
+            if plugin_class is None:
+                return None
+            try:
+                plugin = self.plugins[country_code] = plugin_class()
+            except Exception as e:
+                logging.error(f"❌ Failed to load plugin {country_code}: {e}")
+                return None
+        return plugin
     
     def list_available(self) -> Dict[str, str]:
-        """List all available jurisdictions"""
-        return {
-            code: plugin.law_name 
-            for code, plugin in self.plugins.items()
-        }
+        """List all available jurisdictions (shared dict - do not modify)"""
+        # The plugin set only changes in load_plugins(), which resets the cache
+        if self._available is None:
+            self._available = {
+                code: plugin_class.law_name 
+                for code, plugin_class in self.plugin_classes.items()
+            }
+        return self._available
     
     def validate_notice(self, notice_data: Dict) -> tuple[bool, Optional[str]]:
         """Validate notice using active plugin"""
@@ -3,40 +3,11 @@ Poland Copyright Law Plugin
 Ustawa o prawie autorskim i prawach pokrewnych
 """
 
-from typing import Dict, Optional, List
+from types import MappingProxyType
+from typing import Dict, Mapping, Tuple
 from .base import CopyrightPlugin
 
-
-class PolandCopyrightPlugin(CopyrightPlugin):
-    """Plugin for Polish copyright law"""
-    
-    @property
-    def country_code(self) -> str:
-        return "PL"
-    
-    @property
-    def law_name(self) -> str:
-        return "Ustawa o prawie autorskim i prawach pokrewnych"
-    
-    @property
-    def law_reference(self) -> str:
-        return "Dz.U. 1994 nr 24 poz. 83 z późn. zm."
-    
-    def get_required_fields(self) -> List[str]:
-        return [
-            'complainant_name',
-            'contact_address',
-            'contact_email',
-            'contact_phone',
-            'work_description',
-            'infringing_cid',
-            'justification',
-            'good_faith_statement',
-            'signature'
-        ]
-    
-    def get_notice_template(self) -> str:
-        return """
+_NOTICE_TEMPLATE = """
 # Zgłoszenie naruszenia praw autorskich
 
 ## Ustawa o prawie autorskim i prawach pokrewnych (Polska)
@@ -100,36 +71,8 @@ class PolandCopyrightPlugin(CopyrightPlugin):
 
 **Podstawa prawna:** Ustawa z dnia 4 lutego 1994 r. o prawie autorskim i prawach pokrewnych (Dz.U. 1994 nr 24 poz. 83 z późn. zm.)
 """
-    
-    def validate_notice(self, notice_data: Dict) -> tuple[bool, Optional[str]]:
-        """Validate Polish copyright notice"""
-        
-        required = self.get_required_fields()
-        for field in required:
-            if not notice_data.get(field):
-                return False, f"Brak wymaganego pola: {field}"
-        
-        # Validate CID
-        cid = notice_data.get('infringing_cid', '')
-        if not (cid.startswith('Qm') or cid.startswith('bafy') or cid.startswith('k51')):
-            return False, "Nieprawidłowy format CID IPFS"
-        
-        # Validate email
-        email = notice_data.get('contact_email', '')
-        if '@' not in email or '.' not in email:
-            return False, "Nieprawidłowy adres email"
-        
-        # Check good faith statement
-        if not notice_data.get('good_faith_statement'):
-            return False, "Wymagane jest oświadczenie o działaniu w dobrej wierze"
-        
-        return True, None
-    
-    def get_sla_hours(self) -> int:
-        return 72  # 3 business days
-    
-    def get_counter_notice_template(self) -> str:
-        return """
+
+_COUNTER_NOTICE_TEMPLATE = """
 # Sprzeciw wobec usunięcia treści
 
 ## Prawo autorskie i prawa pokrewne (Polska)
@@ -175,23 +118,63 @@ class PolandCopyrightPlugin(CopyrightPlugin):
 
 **Dalsze kroki:** W przypadku negatywnej decyzji możesz skierować sprawę do sądu powszechnego.
 """
-    
-    def get_footer_html(self) -> str:
-        return """
+
+_FOOTER_HTML = """
 <div class="pl-copyright-badge" style="background:#dc143c;color:white;padding:15px;border-radius:8px;text-align:center;margin:30px 0;border:2px solid #a00000;">
     🇵🇱 Zgodność z polskim prawem autorskim<br>
     <a href="/copyright/report" style="color:white;text-decoration:underline;">Zgłoś naruszenie praw autorskich</a><br>
     <small>Ustawa o prawie autorskim i prawach pokrewnych (Dz.U. 1994 nr 24 poz. 83)</small>
 </div>
 """
+
+
+class PolandCopyrightPlugin(CopyrightPlugin):
+    """Plugin for Polish copyright law"""
     
-    def get_takedown_reasons(self) -> Dict[str, str]:
-        return {
-            'naruszenie_praw_autorskich': 'Naruszenie praw autorskich',
-            'naruszenie_praw_osobistych': 'Naruszenie praw osobistych twórcy',
-            'naruszenie_praw_pokrewnych': 'Naruszenie praw pokrewnych',
-            'plagiat': 'Plagiat'
-        }
+    __slots__ = ()
+    
+    country_code = "PL"
+    law_name = "Ustawa o prawie autorskim i prawach pokrewnych"
+    law_reference = "Dz.U. 1994 nr 24 poz. 83 z późn. zm."
+    
+    REQUIRED_FIELDS = (
+        'complainant_name',
+        'contact_address',
+        'contact_email',
+        'contact_phone',
+        'work_description',
+        'infringing_cid',
+        'justification',
+        'good_faith_statement',
+        'signature',
+    )
+    TAKEDOWN_REASONS = MappingProxyType({
+        'naruszenie_praw_autorskich': 'Naruszenie praw autorskich',
+        'naruszenie_praw_osobistych': 'Naruszenie praw osobistych twórcy',
+        'naruszenie_praw_pokrewnych': 'Naruszenie praw pokrewnych',
+        'plagiat': 'Plagiat',
+    })
+    INVALID_CID_MSG = "Nieprawidłowy format CID IPFS"
+    INVALID_EMAIL_MSG = "Nieprawidłowy adres email"
+    MISSING_FIELD_MSG = "Brak wymaganego pola: {field}"
+    
+    def get_required_fields(self) -> Tuple[str, ...]:
+        return self.REQUIRED_FIELDS
+    
+    def get_notice_template(self) -> str:
+        return _NOTICE_TEMPLATE
+    
+    def get_sla_hours(self) -> int:
+        return 72  # 3 business days
+    
+    def get_counter_notice_template(self) -> str:
+        return _COUNTER_NOTICE_TEMPLATE
+    
+    def get_footer_html(self) -> str:
+        return _FOOTER_HTML
+    
+    def get_takedown_reasons(self) -> Mapping[str, str]:
+        return self.TAKEDOWN_REASONS
     
     def get_blocked_page_text(self, reason: str, language: str = 'pl') -> Dict[str, str]:
         return {
@@ -203,3 +186,6 @@ class PolandCopyrightPlugin(CopyrightPlugin):
             'link': '/copyright/counter-notice',
             'note': 'Prawa osobiste twórcy są niezbywalne i nieograniczone w czasie (Art. 16 ust. 2)'
         }
+
+
+PLUGIN_CLASS = PolandCopyrightPlugin
@@ -3,40 +3,11 @@ USA DMCA (Digital Millennium Copyright Act) Plugin
 17 U.S.C. § 512 - Safe Harbor Provisions
 """
 
-from typing import Dict, Optional, List
+from types import MappingProxyType
+from typing import Dict, Mapping, Tuple
 from .base import CopyrightPlugin
 
-
-class USDMCAPlugin(CopyrightPlugin):
-    """DMCA compliance plugin for United States"""
-    
-    @property
-    def country_code(self) -> str:
-        return "US"
-    
-    @property
-    def law_name(self) -> str:
-        return "DMCA (Digital Millennium Copyright Act)"
-    
-    @property
-    def law_reference(self) -> str:
-        return "17 U.S.C. § 512"
-    
-    def get_required_fields(self) -> List[str]:
-        return [
-            'copyright_owner',
-            'contact_email',
-            'contact_address',
-            'contact_phone',
-            'infringing_cid',
-            'copyrighted_work_description',
-            'good_faith_statement',
-            'accuracy_statement',
-            'signature'
-        ]
-    
-    def get_notice_template(self) -> str:
-        return """
+_NOTICE_TEMPLATE = """
 # DMCA Takedown Notice
 
 ## Required Information Under 17 U.S.C. § 512(c)(3)
@@ -78,44 +49,8 @@ class USDMCAPlugin(CopyrightPlugin):
 
 **Response Time:** We will respond within 48 hours.
 """
-    
-    def validate_notice(self, notice_data: Dict) -> tuple[bool, Optional[str]]:
-        """Validate DMCA notice requirements"""
-        
-        # Check all required fields
-        for field in self.get_required_fields():
-            if not notice_data.get(field):
-                return False, f"Missing required field: {field}"
-        
-        # Validate CID format
-        cid = notice_data.get('infringing_cid', '')
-        if not (cid.startswith('Qm') or cid.startswith('bafy') or cid.startswith('k51')):
-            return False, "Invalid IPFS CID format"
-        
-        # Validate email
-        email = notice_data.get('contact_email', '')
-        if '@' not in email or '.' not in email:
-            return False, "Invalid email address"
-        
-        # Check good faith statement
-        if not notice_data.get('good_faith_statement'):
-            return False, "Good faith statement is required"
-        
-        # Check accuracy statement (under penalty of perjury)
-        if not notice_data.get('accuracy_statement'):
-            return False, "Accuracy statement under penalty of perjury is required"
-        
-        # Check signature
-        if not notice_data.get('signature'):
-            return False, "Physical or electronic signature is required"
-        
-        return True, None
-    
-    def get_sla_hours(self) -> int:
-        return 48  # DMCA requires "expeditious" removal
-    
-    def get_counter_notice_template(self) -> str:
-        return """
+
+_COUNTER_NOTICE_TEMPLATE = """
 # DMCA Counter-Notice
 
 ## Under 17 U.S.C. § 512(g)
@@ -149,22 +84,59 @@ class USDMCAPlugin(CopyrightPlugin):
 
 **Processing Time:** Content may be restored in 10-14 business days unless the original complainant files a court action.
 """
-    
-    def get_footer_html(self) -> str:
-        return """
+
+_FOOTER_HTML = """
 <div class="dmca-badge" style="background:#e74c3c;color:white;padding:15px;border-radius:8px;text-align:center;margin:30px 0;border:2px solid #c0392b;">
     📋 DMCA Compliant Gateway (USA)<br>
     <a href="/copyright/report" style="color:white;text-decoration:underline;font-weight:bold;">Report Copyright Infringement</a><br>
     <small>Protected by 17 U.S.C. § 512 Safe Harbor provisions</small>
 </div>
 """
+
+
+class USDMCAPlugin(CopyrightPlugin):
+    """DMCA compliance plugin for United States"""
     
-    def get_takedown_reasons(self) -> Dict[str, str]:
-        return {
-            'dmca': 'DMCA Takedown Notice',
-            'copyright': 'Copyright Infringement',
-            'trademark': 'Trademark Infringement'
-        }
+    __slots__ = ()
+    
+    country_code = "US"
+    law_name = "DMCA (Digital Millennium Copyright Act)"
+    law_reference = "17 U.S.C. § 512"
+    
+    REQUIRED_FIELDS = (
+        'copyright_owner',
+        'contact_email',
+        'contact_address',
+        'contact_phone',
+        'infringing_cid',
+        'copyrighted_work_description',
+        'good_faith_statement',
+        'accuracy_statement',
+        'signature',
+    )
+    TAKEDOWN_REASONS = MappingProxyType({
+        'dmca': 'DMCA Takedown Notice',
+        'copyright': 'Copyright Infringement',
+        'trademark': 'Trademark Infringement',
+    })
+    
+    def get_required_fields(self) -> Tuple[str, ...]:
+        return self.REQUIRED_FIELDS
+    
+    def get_notice_template(self) -> str:
+        return _NOTICE_TEMPLATE
+    
+    def get_sla_hours(self) -> int:
+        return 48  # DMCA requires "expeditious" removal
+    
+    def get_counter_notice_template(self) -> str:
+        return _COUNTER_NOTICE_TEMPLATE
+    
+    def get_footer_html(self) -> str:
+        return _FOOTER_HTML
+    
+    def get_takedown_reasons(self) -> Mapping[str, str]:
+        return self.TAKEDOWN_REASONS
     
     def get_blocked_page_text(self, reason: str, language: str = 'en') -> Dict[str, str]:
         return {
@@ -175,3 +147,6 @@ class USDMCAPlugin(CopyrightPlugin):
             'action': 'If you believe this removal was in error, you may file a DMCA counter-notice.',
             'link': '/copyright/counter-notice'
         }
+
+
+PLUGIN_CLASS = USDMCAPlugin
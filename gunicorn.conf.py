@@ -0,0 +1,29 @@
+# ServeBeer IPFS Gateway - Gunicorn configuration
+# Usage: gunicorn -c gunicorn.conf.py wsgi:app
+
+import multiprocessing
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+bind = f"{os.getenv('APP_HOST', '0.0.0.0')}:{os.getenv('APP_PORT', '8081')}"
+
+# Proxying to the local IPFS daemon is I/O bound: a few processes with many
+# threads each scale far better than the single Werkzeug dev server.
+worker_class = 'gthread'
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.getenv('GUNICORN_THREADS', '16'))
+worker_tmp_dir = '/dev/shm'
+keepalive = 5
+timeout = 60
+graceful_timeout = 30
+
+# Background threads are started per worker from wsgi.py; preloading would
+# start them in the master where they do not survive fork().
+preload_app = False
+
+# Optional TLS (same certificates as the dev server)
+certfile = os.getenv('SSL_CERT_FILE') or None
+keyfile = os.getenv('SSL_KEY_FILE') or None
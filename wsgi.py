@@ -0,0 +1,10 @@
+"""WSGI entry point for production servers.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Gunicorn imports this module inside each worker (do not use --preload),
+so every worker gets its own DB writer threads and connections.
+"""
+from app import app, start_background_tasks
+
+start_background_tasks()